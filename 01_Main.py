@@ -1,22 +1,35 @@
 import streamlit as st
 from utils import (
     adjust_process,
-    calculate_line_performance,
+    analyze_line,
+    cached_figure,
     display_summary,
-    plot_cost_profit_analysis_line
+    plot_cost_profit_analysis_line,
+    profiled,
+    session_footprint
 )
 
 def main():
     st.title("📈 Umwelt & Wertschöpfungsmanagement: Papierflugzeugproduktion")
 
     steps, runtime, sale_price, material_cost = adjust_process()  #Sidebar
-    results = calculate_line_performance(steps, runtime, sale_price, material_cost)
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+    results = entry["results"]
 
     display_summary(results)
 
     st.markdown("## Kosten- und Gewinnanalyse über die Laufzeit")
-    line_fig = plot_cost_profit_analysis_line(results)
-    st.plotly_chart(line_fig, use_container_width=True)
+    line_fig = cached_figure(entry, "cost_profit_line", plot_cost_profit_analysis_line, results)
+    with profiled("plotly_chart:cost_profit_line"):
+        st.plotly_chart(line_fig, use_container_width=True)
+
+    if st.checkbox("Speicherbedarf dieser Sitzung anzeigen"):
+        sizes = session_footprint()
+        st.metric("Sitzungszustand", f"{sum(sizes.values()) / 1024:,.1f} kB")
+        st.dataframe(
+            {"Schlüssel": list(sizes), "Bytes": list(sizes.values())},
+            hide_index=True
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,213 @@
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from model import DEFAULT_STEPS, STEP_FIELDS, calculate_line_performance, calculate_line_performance_batch
+from shift import simulate_shift
+
+# Benchmark suite for the cost model and the figure builders.
+#
+#     python benchmark.py -o bench.json
+#     python benchmark.py -o bench_new.json --compare bench.json --threshold 1.25
+#
+# Every case records median/min wall time over a few repeats and the tracemalloc peak of
+# one extra run. Figure cases also record the JSON payload size in bytes. The report is
+# plain JSON so two runs can be compared; --compare exits with status 1 when any case got
+# slower or larger than the threshold allows.
+
+ROOT = Path(__file__).resolve().parent
+STEP_COUNTS = [6, 30, 100, 300, 1000]
+RUNTIMES = [480, 10000]
+QUICK_STEP_COUNTS = [6, 100]
+QUICK_RUNTIMES = [480]
+BATCH_CONFIGS = 1000
+BATCH_SCALAR_SAMPLE = 50
+
+
+def _load_page(filename):
+    # Pages start with a digit, so they are loaded by path instead of by import
+    path = ROOT / "pages" / filename
+    spec = importlib.util.spec_from_file_location(path.stem.lstrip("0123456789_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_steps(n_steps, seed=0):
+    rng = np.random.default_rng(seed)
+    steps = []
+    for i in range(n_steps):
+        base = DEFAULT_STEPS[i % len(DEFAULT_STEPS)]
+        steps.append({
+            "Schritt": f"{base['Schritt']} {i + 1}",
+            "Zykluszeit (Minuten)": float(np.round(rng.uniform(0.5, 12.0), 1)),
+            "Maschinen": int(rng.integers(1, 5)),
+            "Anschaffungskosten (€)": float(np.round(rng.uniform(50, 1000), 0)),
+            "Stillstandskostenrate (€/Min)": float(np.round(rng.uniform(0.1, 4.0), 2)),
+            "Fehlerquote (%)": float(np.round(rng.uniform(0.0, 12.0 / max(1, n_steps / 6)), 2)),
+            "Kosten pro fehlerhafte Einheit (€)": float(np.round(rng.uniform(1, 25), 1))
+        })
+    return steps
+
+
+def measure(func, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "repeats": repeats,
+        "peak_bytes": peak
+    }
+
+
+def run_suite(step_counts=STEP_COUNTS, runtimes=RUNTIMES, repeats=5):
+    from utils import plot_cost_profit_analysis_line
+    gewinn = _load_page("02_Gewinnanalyse.py")
+    fehler = _load_page("03_Fehleranalyse.py")
+
+    cases = []
+
+    def record(name, n_steps, runtime, stats, **extra):
+        case = {"name": name, "steps": n_steps, "runtime": runtime}
+        case.update(stats)
+        case.update(extra)
+        cases.append(case)
+        print(f"{name:32s} steps={n_steps:5d} runtime={runtime:6d} median={stats['median_s'] * 1e6:12.1f} µs", file=sys.stderr)
+
+    for n_steps in step_counts:
+        steps = synthetic_steps(n_steps)
+        for runtime in runtimes:
+            results, stats = measure(lambda: calculate_line_performance(steps, runtime, 300.0, 25.0), repeats)
+            record("calculate_line_performance", n_steps, runtime, stats)
+
+            figure_builders = {
+                "plot_cost_profit_analysis_line": lambda: plot_cost_profit_analysis_line(results),
+                "plot_waterfall": lambda: gewinn.plot_waterfall(results),
+                "plot_cost_breakdown_per_step": lambda: gewinn.plot_cost_breakdown_per_step(results),
+                "plot_sankey": lambda: fehler.plot_sankey(results)
+            }
+            for name, builder in figure_builders.items():
+                fig, stats = measure(builder, repeats)
+                _, json_stats = measure(fig.to_json, repeats)
+                record(name, n_steps, runtime, stats,
+                       payload_bytes=len(fig.to_json().encode("utf-8")),
+                       serialize_median_s=json_stats["median_s"])
+
+            _, stats = measure(lambda: simulate_shift(
+                steps, runtime, 300.0, 25.0, ramp_minutes=60, breaks=[(runtime // 2, 30, None)],
+                mtbf=240.0, mttr=15.0, seed=0
+            ), repeats)
+            record("simulate_shift", n_steps, runtime, stats)
+
+        # Scalar vs. batched evaluation of many configurations of this line length
+        rng = np.random.default_rng(n_steps)
+        arrays = {field: np.array([float(step[field]) for step in steps]) for field in STEP_FIELDS}
+        machines = rng.integers(1, 5, (BATCH_CONFIGS, n_steps)).astype(float)
+        per_step = [machines if field == "Maschinen" else np.broadcast_to(arrays[field], machines.shape)
+                    for field in STEP_FIELDS]
+        _, stats = measure(lambda: calculate_line_performance_batch(*per_step, 480.0, 300.0, 25.0), repeats)
+        record("batch_per_config", n_steps, 480,
+               dict(stats, median_s=stats["median_s"] / BATCH_CONFIGS, min_s=stats["min_s"] / BATCH_CONFIGS),
+               configs=BATCH_CONFIGS)
+
+        def scalar_loop():
+            for row in machines[:BATCH_SCALAR_SAMPLE]:
+                calculate_line_performance([dict(step, Maschinen=m) for step, m in zip(steps, row)], 480.0, 300.0, 25.0)
+        _, stats = measure(scalar_loop, max(1, repeats // 2))
+        record("scalar_per_config", n_steps, 480,
+               dict(stats, median_s=stats["median_s"] / BATCH_SCALAR_SAMPLE, min_s=stats["min_s"] / BATCH_SCALAR_SAMPLE),
+               configs=BATCH_SCALAR_SAMPLE)
+
+    return cases
+
+
+def environment():
+    import pandas
+    import plotly
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "plotly": plotly.__version__
+    }
+
+
+def compare(report, baseline, threshold):
+    # Cases are matched on (name, steps, runtime); returns the list of regressions
+    old_cases = {(c["name"], c["steps"], c["runtime"]): c for c in baseline["cases"]}
+    regressions = []
+    for case in report["cases"]:
+        old = old_cases.get((case["name"], case["steps"], case["runtime"]))
+        if old is None:
+            continue
+        for metric in ("median_s", "peak_bytes", "payload_bytes"):
+            if metric in case and old.get(metric):
+                ratio = case[metric] / old[metric]
+                if ratio > threshold:
+                    regressions.append({
+                        "name": case["name"],
+                        "steps": case["steps"],
+                        "runtime": case["runtime"],
+                        "metric": metric,
+                        "old": old[metric],
+                        "new": case[metric],
+                        "ratio": ratio
+                    })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark für Kostenmodell und Diagramme.")
+    parser.add_argument("-o", "--output", default="-", help="JSON-Report, '-' für stdout")
+    parser.add_argument("--quick", action="store_true", help="Nur kleine Linien und eine Laufzeit")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--compare", help="Früherer Report zum Vergleich")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Erlaubter Faktor gegenüber dem Vergleich")
+    args = parser.parse_args(argv)
+
+    step_counts = QUICK_STEP_COUNTS if args.quick else STEP_COUNTS
+    runtimes = QUICK_RUNTIMES if args.quick else RUNTIMES
+    report = {"environment": environment(), "cases": run_suite(step_counts, runtimes, args.repeats)}
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            report["regressions"] = compare(report, json.load(fh), args.threshold)
+
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+
+    for regression in report.get("regressions", []):
+        print(
+            f"REGRESSION {regression['name']} steps={regression['steps']} runtime={regression['runtime']} "
+            f"{regression['metric']}: {regression['old']:.4g} -> {regression['new']:.4g} (x{regression['ratio']:.2f})",
+            file=sys.stderr
+        )
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
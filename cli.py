@@ -0,0 +1,241 @@
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+
+from model import KPI_NAMES, STEP_FIELDS, evaluate_scenarios
+
+# Headless evaluation of scenario files, e.g.
+#
+#     python cli.py varianten.jsonl -o kpis.csv --runtime 480
+#
+# Input formats:
+#   .json            an array of scenarios, a single scenario object, or one list of steps
+#   .jsonl/.ndjson   one scenario per line
+#   .csv/.parquet    long format with one row per step; consecutive rows with the same
+#                    "scenario" value form one line (without that column the whole file is one line)
+# A scenario is {"name": ..., "steps": [...], "runtime": ..., "sale_price": ..., "material_cost": ...}
+# or just a list of steps; missing scalars come from the command line. Everything is streamed,
+# so memory stays bounded by --chunk-size whatever the file size.
+# Output formats: .csv, .jsonl and, for large sweeps, the columnar .arrow or .parquet, which
+# the Daten page opens without parsing every row.
+
+SCALAR_KEYS = ["runtime", "sale_price", "material_cost"]
+ARROW_OUTPUT_SUFFIXES = (".arrow", ".feather", ".parquet", ".pq")
+_JSON_BLOCK = 1 << 16
+
+
+def _iter_json_values(fh):
+    # Streams the elements of a top-level JSON array; any other document is yielded whole
+    decoder = json.JSONDecoder()
+    buf = fh.read(_JSON_BLOCK).lstrip()
+    if not buf.startswith("["):
+        yield json.loads(buf + fh.read())
+        return
+    pos = 1
+    eof = False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf) or buf[pos] != "]":
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = fh.read(_JSON_BLOCK)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            yield value
+            pos = end
+            if pos > _JSON_BLOCK:
+                buf = buf[pos:]
+                pos = 0
+        else:
+            return
+
+
+def _is_step(value):
+    return isinstance(value, dict) and "Schritt" in value
+
+
+def _iter_json_scenarios(path):
+    with open(path, encoding="utf-8") as fh:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        values = _iter_json_values(fh)
+        first = next(values, None)
+        if first is None:
+            return
+        if _is_step(first):
+            # The file is a single line given as a bare list of steps
+            yield [first] + list(values)
+            return
+        yield first
+        yield from values
+
+
+def _group_step_rows(rows):
+    # Consecutive long-format rows with the same scenario id form one scenario
+    for name, group in itertools.groupby(rows, key=lambda row: row.get("scenario")):
+        group = list(group)
+        scenario = {"name": name, "steps": []}
+        for key in SCALAR_KEYS:
+            if group[0].get(key) not in (None, ""):
+                scenario[key] = float(group[0][key])
+        for row in group:
+            step = {"Schritt": row.get("Schritt", "")}
+            for field in STEP_FIELDS:
+                step[field] = float(row[field])
+            scenario["steps"].append(step)
+        yield scenario
+
+
+def _iter_csv_scenarios(path):
+    with open(path, encoding="utf-8", newline="") as fh:
+        yield from _group_step_rows(csv.DictReader(fh))
+
+
+def _iter_parquet_scenarios(path, batch_size=65536):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Zum Lesen von Parquet-Dateien wird pyarrow benötigt.")
+    parquet_file = pq.ParquetFile(path)
+    rows = (row for batch in parquet_file.iter_batches(batch_size=batch_size) for row in batch.to_pylist())
+    yield from _group_step_rows(rows)
+
+
+def iter_scenarios(path):
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in (".json", ".jsonl", ".ndjson"):
+        return _iter_json_scenarios(path)
+    if suffix == ".csv":
+        return _iter_csv_scenarios(path)
+    if suffix in (".parquet", ".pq"):
+        return _iter_parquet_scenarios(path)
+    raise SystemExit(f"Unbekanntes Eingabeformat: {path.suffix}")
+
+
+def _normalize(scenarios, defaults):
+    for index, scenario in enumerate(scenarios):
+        if isinstance(scenario, list):
+            scenario = {"steps": scenario}
+        scenario = dict(defaults, **scenario)
+        if scenario.get("name") is None:
+            scenario["name"] = str(index)
+        yield scenario
+
+
+class _CsvWriter:
+    def __init__(self, fh):
+        self._writer = csv.writer(fh)
+        self._writer.writerow(["scenario", "steps"] + SCALAR_KEYS + KPI_NAMES)
+
+    def write(self, scenario, kpis):
+        self._writer.writerow(
+            [scenario["name"], len(scenario["steps"])]
+            + [scenario[key] for key in SCALAR_KEYS]
+            + [repr(kpis[name]) for name in KPI_NAMES]
+        )
+
+
+class _ArrowWriter:
+    # Columnar output (.arrow or .parquet), written one record batch per chunk, so a
+    # million-row sweep can be opened memory-mapped in the app (exchange.open_table)
+    def __init__(self, path, batch_size=65536):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise SystemExit("Zum Schreiben von Arrow-/Parquet-Dateien wird pyarrow benötigt.")
+        self._pa = pa
+        self.schema = pa.schema(
+            [("scenario", pa.string()), ("steps", pa.int64())]
+            + [(key, pa.float64()) for key in SCALAR_KEYS + KPI_NAMES]
+        )
+        if Path(path).suffix.lower() in (".parquet", ".pq"):
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(path, self.schema)
+        else:
+            self._writer = pa.ipc.new_file(path, self.schema)
+        self.batch_size = batch_size
+        self._rows = {name: [] for name in self.schema.names}
+
+    def write(self, scenario, kpis):
+        rows = self._rows
+        rows["scenario"].append(str(scenario["name"]))
+        rows["steps"].append(len(scenario["steps"]))
+        for key in SCALAR_KEYS:
+            rows[key].append(float(scenario[key]))
+        for name in KPI_NAMES:
+            rows[name].append(float(kpis[name]))
+        if len(rows["scenario"]) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows["scenario"]:
+            self._writer.write_table(self._pa.Table.from_pydict(self._rows, schema=self.schema))
+            self._rows = {name: [] for name in self.schema.names}
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+class _JsonlWriter:
+    def __init__(self, fh):
+        self._fh = fh
+
+    def write(self, scenario, kpis):
+        row = {"scenario": scenario["name"], "steps": len(scenario["steps"])}
+        row.update({key: scenario[key] for key in SCALAR_KEYS})
+        row.update(kpis)
+        self._fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kennzahlen für Szenario-Dateien berechnen (ohne Streamlit).")
+    parser.add_argument("input", help="Szenario-Datei (.json, .jsonl, .csv, .parquet)")
+    parser.add_argument("-o", "--output", default="-", help="Ausgabe (.csv, .jsonl, .arrow oder .parquet), '-' für stdout (CSV)")
+    parser.add_argument("--runtime", type=float, default=480.0, help="Laufzeit (Minuten), falls nicht im Szenario")
+    parser.add_argument("--sale-price", type=float, default=300.0, help="Verkaufspreis pro Einheit (€)")
+    parser.add_argument("--material-cost", type=float, default=25.0, help="Materialkosten pro Einheit (€)")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="Szenarien pro Batch-Auswertung")
+    args = parser.parse_args(argv)
+
+    defaults = {"runtime": args.runtime, "sale_price": args.sale_price, "material_cost": args.material_cost}
+    scenarios = _normalize(iter_scenarios(args.input), defaults)
+
+    start = time.perf_counter()
+    count = 0
+    suffix = Path(args.output).suffix.lower() if args.output != "-" else ""
+    if suffix in ARROW_OUTPUT_SUFFIXES:
+        out = None
+        writer = _ArrowWriter(args.output)
+    else:
+        out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+        writer = _JsonlWriter(out) if suffix in (".jsonl", ".ndjson") else _CsvWriter(out)
+    try:
+        for scenario, kpis in evaluate_scenarios(scenarios, chunk_size=args.chunk_size):
+            writer.write(scenario, kpis)
+            count += 1
+    finally:
+        if out is None:
+            writer.close()
+        elif out is not sys.stdout:
+            out.close()
+    print(f"{count} Szenarien in {time.perf_counter() - start:.2f} s ausgewertet.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import io
+import json
+import os
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from model import STEP_FIELDS, STEP_LIMITS, cost_profit_curves
+
+# Columnar export and import (Apache Arrow IPC, Parquet, CSV).
+#
+# An export holds three tables: the steps (name, the six fields and optional keys such as
+# the process graph or "Bereich"), the per-step results and the per-minute cost curves.
+# Runtime, prices and KPIs travel as JSON in the schema metadata under METADATA_KEY, so a
+# steps file restores the sidebar as well.
+#
+# open_table reads Arrow files memory-mapped, so the columns point into the page cache and
+# nothing is parsed; Parquet and CSV are decoded column by column. filter_table runs on the
+# Arrow columns and only the selected rows become a DataFrame. This keeps million-row sweep
+# outputs (cli.py -o result.arrow) usable in the app.
+#
+# Files on the server are only opened from DATA_DIR (UWM_DATA_DIR); without it only uploads
+# are accepted.
+#
+# pyarrow is only needed for these functions, as in cli.py.
+
+METADATA_KEY = b"uwm"
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+PARQUET_SUFFIXES = (".parquet", ".pq")
+SCALAR_KEYS = ["runtime", "sale_price", "material_cost"]
+DATA_DIR = os.environ.get("UWM_DATA_DIR")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("Für den Export und Import von Arrow-/Parquet-Dateien wird pyarrow benötigt.")
+    return pyarrow
+
+
+def _with_metadata(table, metadata):
+    return table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata, ensure_ascii=False)})
+
+
+def table_metadata(table):
+    raw = (table.schema.metadata or {}).get(METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def steps_table(steps, runtime=None, sale_price=None, material_cost=None):
+    pa = _pyarrow()
+    columns = {"Schritt": pa.array([step["Schritt"] for step in steps], pa.string())}
+    for field in STEP_FIELDS:
+        columns[field] = pa.array([float(step[field]) for step in steps], pa.float64())
+    extra_keys = []
+    for step in steps:
+        extra_keys += [key for key in step if key not in columns and key not in extra_keys]
+    for key in extra_keys:
+        values = [step.get(key) for step in steps]
+        try:
+            columns[key] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed types in an optional key are kept as text
+            columns[key] = pa.array([None if value is None else str(value) for value in values], pa.string())
+    scalars = dict(zip(SCALAR_KEYS, (runtime, sale_price, material_cost)))
+    return _with_metadata(pa.table(columns), {key: value for key, value in scalars.items() if value is not None})
+
+
+def results_table(results):
+    pa = _pyarrow()
+    totals = {key: float(value) for key, value in results.items() if key != "df" and np.isscalar(value)}
+    return _with_metadata(pa.Table.from_pandas(results["df"], preserve_index=False), {"kpis": totals})
+
+
+def curves_table(results):
+    pa = _pyarrow()
+    curves = cost_profit_curves(results)
+    return pa.table({name: pa.array(values) for name, values in curves.items()})
+
+
+def export_tables(steps, results, runtime, sale_price, material_cost):
+    return {
+        "schritte": steps_table(steps, runtime, sale_price, material_cost),
+        "ergebnisse": results_table(results),
+        "kurven": curves_table(results)
+    }
+
+
+def table_bytes(table, fmt="arrow"):
+    pa = _pyarrow()
+    sink = pa.BufferOutputStream()
+    if fmt == "arrow":
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink)
+    else:
+        raise ValueError(f"Unbekanntes Format: {fmt}")
+    return sink.getvalue().to_pybytes()
+
+
+def export_bundle(tables, fmt="arrow"):
+    # All tables of an export in one ZIP file; the tables are already compressed or
+    # binary, so they are stored as is
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as bundle:
+        for name, table in tables.items():
+            bundle.writestr(f"{name}{FORMATS[fmt]}", table_bytes(table, fmt))
+    return buffer.getvalue()
+
+
+def open_table(source, name=None):
+    # source: a path or the bytes of an uploaded file (then name gives the suffix).
+    # Arrow files from disk are memory-mapped, uploaded bytes are wrapped without a copy.
+    pa = _pyarrow()
+    suffix = Path(name if name is not None else str(source)).suffix.lower()
+    from_path = isinstance(source, (str, Path))
+    if suffix in ARROW_SUFFIXES:
+        data = pa.memory_map(str(source), "r") if from_path else pa.BufferReader(source)
+        try:
+            return pa.ipc.open_file(data).read_all()
+        except pa.ArrowInvalid:
+            # Arrow stream format (no footer)
+            data.seek(0)
+            return pa.ipc.open_stream(data).read_all()
+    if suffix in PARQUET_SUFFIXES:
+        import pyarrow.parquet as pq
+
+        return pq.read_table(str(source) if from_path else pa.BufferReader(source), memory_map=from_path)
+    if suffix == ".csv":
+        import pyarrow.csv as pv
+
+        return pv.read_csv(str(source) if from_path else pa.BufferReader(source))
+    raise ValueError(f"Unbekanntes Dateiformat: {suffix or '(ohne Endung)'}")
+
+
+def resolve_data_path(name, root=DATA_DIR):
+    # Path of a file below root; symlinks and ".." are resolved first, so nothing outside
+    # root can be reached. Missing and outside files give the same error.
+    if not root:
+        raise ValueError("Kein Datenverzeichnis konfiguriert (UWM_DATA_DIR).")
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise ValueError(f"Datei nicht gefunden im Datenverzeichnis: {name}")
+    return path
+
+
+def numeric_columns(table):
+    pa = _pyarrow()
+    return [field.name for field in table.schema if pa.types.is_integer(field.type) or pa.types.is_floating(field.type)]
+
+
+def filter_table(table, column=None, minimum=None, maximum=None, sort_by=None, descending=True, limit=None):
+    # Range filter on one column, sort and limit, all on the Arrow columns
+    _pyarrow()
+    import pyarrow.compute as pc
+
+    if column is not None:
+        mask = None
+        if minimum is not None:
+            mask = pc.greater_equal(table[column], minimum)
+        if maximum is not None:
+            upper = pc.less_equal(table[column], maximum)
+            mask = upper if mask is None else pc.and_(mask, upper)
+        if mask is not None:
+            table = table.filter(mask)
+    if sort_by is not None:
+        if limit is not None and limit < table.num_rows:
+            # Top-k selection instead of a full sort
+            select = pc.select_k_unstable(table, limit, [(sort_by, "descending" if descending else "ascending")])
+            table = table.take(select)
+        table = table.sort_by([(sort_by, "descending" if descending else "ascending")])
+    if limit is not None:
+        table = table.slice(0, limit)
+    return table
+
+
+def _checked_value(step_name, field, value):
+    # Imported values have to fit the sidebar limits, as typed-in ones do
+    if value is None:
+        raise ValueError(f"Schritt {step_name}: {field} fehlt")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Schritt {step_name}: {field} ist keine Zahl ({value!r})")
+    low, high, _ = STEP_LIMITS[field]
+    if not low <= value <= high:
+        raise ValueError(f"Schritt {step_name}: {field} = {value:g} liegt nicht zwischen {low:g} und {high:g}")
+    if field == "Maschinen":
+        if not value.is_integer():
+            raise ValueError(f"Schritt {step_name}: Maschinen = {value:g} ist keine ganze Zahl")
+        return int(value)
+    return value
+
+
+def read_steps(source, name=None, scenario=None):
+    # Step list from a table with one row per step. With a "scenario" column (long format
+    # as in cli.py) only the rows of the given or the first scenario are used.
+    # Returns (steps, scalars from the metadata or the first row).
+    pa = _pyarrow()
+    import pyarrow.compute as pc
+
+    table = source if isinstance(source, pa.Table) else open_table(source, name)
+    missing = [key for key in ["Schritt"] + STEP_FIELDS if key not in table.column_names]
+    if missing:
+        raise ValueError(f"Spalte(n) fehlen: {', '.join(missing)}")
+    if "scenario" in table.column_names and table.num_rows:
+        ids = table["scenario"]
+        if scenario is None:
+            scenario = ids[0].as_py()
+        table = table.filter(pc.equal(ids, pa.scalar(scenario, ids.type))).drop_columns(["scenario"])
+    if table.num_rows == 0:
+        raise ValueError("Die Datei enthält keine Schritte.")
+
+    scalars = {key: value for key, value in table_metadata(table).items() if key in SCALAR_KEYS}
+    for key in SCALAR_KEYS:
+        # Long-format files repeat the scalars on every row
+        if key not in scalars and key in table.column_names and table[key][0].is_valid:
+            scalars[key] = float(table[key][0].as_py())
+
+    steps = []
+    for row in table.to_pylist():
+        step = {"Schritt": str(row.pop("Schritt"))}
+        for field in STEP_FIELDS:
+            step[field] = _checked_value(step["Schritt"], field, row.pop(field))
+        step.update({key: value for key, value in row.items() if value is not None and key not in SCALAR_KEYS})
+        steps.append(step)
+    return steps, scalars
+
+
+def scenario_ids(table):
+    # Distinct values of the "scenario" column in file order, or [] without one
+    if "scenario" not in table.column_names:
+        return []
+    import pyarrow.compute as pc
+
+    return pc.unique(table["scenario"]).to_pylist()
@@ -0,0 +1,144 @@
+import numpy as np
+
+from model import STEP_FIELDS, LineResults
+
+# Incremental version of calculate_line_performance for long lines.
+#
+# Each step contributes to a few aggregates. A segment tree keeps them for every range:
+#   max_eff  max of Zykluszeit / Maschinen (the bottleneck, T_ideal = runtime / max_eff)
+#   rm       sum of Stillstandskostenrate * Maschinen
+#   cr       sum of Zykluszeit * Stillstandskostenrate
+#   capital  sum of Anschaffungskosten * Maschinen
+#   lead     sum of the effective cycle times
+#   survive  product of (1 - fail_rate)
+#   fail     sum_i fail_cost_i * fail_rate_i * prod_{j<i}(1 - fail_rate_j)
+# Two adjacent ranges combine with fail = fail_L + survive_L * fail_R, so the whole line
+# follows from the root: overhead = runtime * rm - T * cr, fail cost = T * fail,
+# good units = T * survive. Editing step k updates log(n) nodes. The per-step table and
+# flows are not part of the tree; results() hands the stored arrays to LineResults, which
+# builds them when a page needs them.
+
+_FIELDS = ("max_eff", "rm", "cr", "capital", "lead", "survive", "fail")
+_IDENTITY = (0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+
+
+def _leaf(cycle_time, machines, capital, idle_rate, fail_percent, fail_cost):
+    fail_rate = fail_percent / 100.0
+    return (
+        cycle_time / machines,
+        idle_rate * machines,
+        cycle_time * idle_rate,
+        capital * machines,
+        cycle_time / machines,
+        1 - fail_rate,
+        fail_cost * fail_rate
+    )
+
+
+def _combine(left, right):
+    return (
+        max(left[0], right[0]),
+        left[1] + right[1],
+        left[2] + right[2],
+        left[3] + right[3],
+        left[4] + right[4],
+        left[5] * right[5],
+        left[6] + left[5] * right[6]
+    )
+
+
+class IncrementalLine:
+    def __init__(self, steps, runtime, sale_price, material_cost):
+        self.runtime = float(runtime)
+        self.sale_price = float(sale_price)
+        self.material_cost = float(material_cost)
+        self.rebuild(steps)
+
+    def rebuild(self, steps):
+        # Structural changes (add, remove, move) rebuild the tree in O(n)
+        self.names = [step["Schritt"] for step in steps]
+        self.values = {field: np.array([float(step[field]) for step in steps]) for field in STEP_FIELDS}
+        n = len(steps)
+        size = 1
+        while size < max(n, 1):
+            size *= 2
+        self._size = size
+        self._tree = [_IDENTITY] * (2 * size)
+        for k in range(n):
+            self._tree[size + k] = self._leaf(k)
+        for node in range(size - 1, 0, -1):
+            self._tree[node] = _combine(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def __len__(self):
+        return len(self.names)
+
+    def _leaf(self, k):
+        return _leaf(*(self.values[field][k] for field in STEP_FIELDS))
+
+    def update_step(self, k, **fields):
+        # Keyword names are the step keys with spaces etc., so pass them as a dict:
+        # line.update_step(3, **{"Maschinen": 2})
+        for field, value in fields.items():
+            self.values[field][k] = float(value)
+        node = self._size + k
+        self._tree[node] = self._leaf(k)
+        node //= 2
+        while node:
+            self._tree[node] = _combine(self._tree[2 * node], self._tree[2 * node + 1])
+            node //= 2
+
+    def set_scalars(self, runtime=None, sale_price=None, material_cost=None):
+        if runtime is not None:
+            self.runtime = float(runtime)
+        if sale_price is not None:
+            self.sale_price = float(sale_price)
+        if material_cost is not None:
+            self.material_cost = float(material_cost)
+
+    def sync(self, steps, runtime, sale_price, material_cost):
+        # Brings the line up to date with a step list and returns the indices that changed.
+        # A different step sequence counts as a structural change.
+        self.set_scalars(runtime, sale_price, material_cost)
+        if [step["Schritt"] for step in steps] != self.names:
+            self.rebuild(steps)
+            return list(range(len(steps)))
+        changed = []
+        for k, step in enumerate(steps):
+            fields = {
+                field: step[field] for field in STEP_FIELDS
+                if float(step[field]) != self.values[field][k]
+            }
+            if fields:
+                self.update_step(k, **fields)
+                changed.append(k)
+        return changed
+
+    def totals(self):
+        # O(1) from the root of the tree
+        max_eff, rm, cr, capital, lead, survive, fail = self._tree[1]
+        T_ideal = self.runtime / max_eff
+        final_good_units = T_ideal * survive
+        total_overhead_cost = max(self.runtime * rm - T_ideal * cr, 0.0)
+        total_fail_cost = T_ideal * fail
+        total_material_cost = T_ideal * self.material_cost
+        total_revenue = final_good_units * self.sale_price
+        total_costs = capital + total_overhead_cost + total_fail_cost + total_material_cost
+        return {
+            "Final_Good_Units": final_good_units,
+            "T_ideal": T_ideal,
+            "Total_Capital_Cost": capital,
+            "Total_Overhead_Cost": total_overhead_cost,
+            "Total_Fail_Cost": total_fail_cost,
+            "Total_Material_Cost": total_material_cost,
+            "Total_Revenue": total_revenue,
+            "Profit": total_revenue - total_costs,
+            "Runtime": self.runtime,
+            "Lead_Time": lead
+        }
+
+    def results(self):
+        # Same keys as calculate_line_performance; the totals come from the tree, and
+        # results["df"] is built from the stored arrays only when it is displayed
+        totals = self.totals()
+        del totals["Lead_Time"]
+        return LineResults(totals, self.names, np.vstack([self.values[field] for field in STEP_FIELDS]))
@@ -0,0 +1,715 @@
+import hashlib
+import json
+import numbers
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
+
+# Pure computation side of the app: the step data model, the cost model and the curve
+# data. Nothing in here imports Streamlit or Plotly, so batch jobs (cli.py, the process
+# pool workers) can use it without the UI import cost. pandas is only imported where a
+# DataFrame is actually built.
+
+DEFAULT_STEPS = [
+    {
+        "Schritt": "Materialeingang",
+        "Zykluszeit (Minuten)": 3.0,
+        "Maschinen": 1,
+        "Anschaffungskosten (€)": 50.0,
+        "Stillstandskostenrate (€/Min)": 0.10,
+        "Fehlerquote (%)": 3.0,
+        "Kosten pro fehlerhafte Einheit (€)": 2.0
+    },
+    {
+        "Schritt": "Schneiden",
+        "Zykluszeit (Minuten)": 6.0,
+        "Maschinen": 1,
+        "Anschaffungskosten (€)": 100.0,
+        "Stillstandskostenrate (€/Min)": 1.20,
+        "Fehlerquote (%)": 2.0,
+        "Kosten pro fehlerhafte Einheit (€)": 5.0
+    },
+    {
+        "Schritt": "Montage",
+        "Zykluszeit (Minuten)": 10.0,
+        "Maschinen": 1,
+        "Anschaffungskosten (€)": 200.0,
+        "Stillstandskostenrate (€/Min)": 2,
+        "Fehlerquote (%)": 3.0,
+        "Kosten pro fehlerhafte Einheit (€)": 10.0
+    },
+    {
+        "Schritt": "Bemalen",
+        "Zykluszeit (Minuten)": 4.0,
+        "Maschinen": 1,
+        "Anschaffungskosten (€)": 800.0,
+        "Stillstandskostenrate (€/Min)": 4,
+        "Fehlerquote (%)": 4.5,
+        "Kosten pro fehlerhafte Einheit (€)": 15.0
+    },
+    {
+        "Schritt": "Qualitätsprüfung",
+        "Zykluszeit (Minuten)": 5.0,
+        "Maschinen": 1,
+        "Anschaffungskosten (€)": 120.0,
+        "Stillstandskostenrate (€/Min)": 2.25,
+        "Fehlerquote (%)": 12.0,
+        "Kosten pro fehlerhafte Einheit (€)": 25.0
+    },
+    {
+        "Schritt": "Versand",
+        "Zykluszeit (Minuten)": 3.0,
+        "Maschinen": 1,
+        "Anschaffungskosten (€)": 70.0,
+        "Stillstandskostenrate (€/Min)": 1.5,
+        "Fehlerquote (%)": 0.5,
+        "Kosten pro fehlerhafte Einheit (€)": 2.0
+    }
+]
+
+
+def add_new_step(steps, new_step):
+    steps.append(new_step)
+    return steps
+
+def remove_steps(steps, steps_to_remove):
+    return [step for step in steps if step["Schritt"] not in steps_to_remove]
+
+def move_step(steps, index, direction):
+    if direction == "up" and index > 0:
+        steps[index], steps[index-1] = steps[index-1], steps[index]
+    elif direction == "down" and index < len(steps)-1:
+        steps[index], steps[index+1] = steps[index+1], steps[index]
+    return steps
+
+
+def calculate_line_performance(steps, runtime, sale_price, material_cost):
+    import pandas as pd
+
+    df = pd.DataFrame(steps)
+    df['Effektive Zykluszeit (Minuten)'] = df['Zykluszeit (Minuten)'] / df['Maschinen']
+    df['fail_rate'] = df['Fehlerquote (%)'] / 100.0
+
+    T_ideal = (runtime / df['Effektive Zykluszeit (Minuten)']).min()
+
+    df['Idle_Time (Min)'] = runtime - (T_ideal * df['Effektive Zykluszeit (Minuten)'])
+    df['Idle_Time (Min)'] = df['Idle_Time (Min)'].where(df['Idle_Time (Min)'] > 0, 0.0)
+    df['Gemeinkosten (€)'] = df['Idle_Time (Min)'] * df['Stillstandskostenrate (€/Min)'] * df['Maschinen']
+
+    # Per-step flows, shared by every page
+    cascade = yield_cascade(
+        np.array([T_ideal]),
+        df['fail_rate'].to_numpy(dtype=float)[None, :],
+        df['Kosten pro fehlerhafte Einheit (€)'].to_numpy(dtype=float)[None, :]
+    )
+    df['Einheiten (Eingang)'] = cascade["units_in"][0]
+    df['Einheiten (Fehler)'] = cascade["units_failed"][0]
+    df['Einheiten (Gut)'] = cascade["units_good"][0]
+    df['Fehlerkosten (Schritt)'] = cascade["fail_cost"][0]
+
+    total_fail_cost = cascade["total_fail_cost"][0]
+    final_good_units = cascade["final_good_units"][0]
+    total_capital_cost = (df['Anschaffungskosten (€)'] * df['Maschinen']).sum()
+    total_overhead_cost = df['Gemeinkosten (€)'].sum()
+    total_material_cost = T_ideal * material_cost
+    total_revenue = final_good_units * sale_price
+    total_costs = total_capital_cost + total_overhead_cost + total_fail_cost + total_material_cost
+    profit = total_revenue - total_costs
+
+    results = {
+        "df": df,
+        "Final_Good_Units": final_good_units,
+        "T_ideal": T_ideal,
+        "Total_Capital_Cost": total_capital_cost,
+        "Total_Overhead_Cost": total_overhead_cost,
+        "Total_Fail_Cost": total_fail_cost,
+        "Total_Material_Cost": total_material_cost,
+        "Total_Revenue": total_revenue,
+        "Profit": profit,
+        "Runtime": runtime
+    }
+    return results
+
+
+STEP_FIELDS = [
+    "Zykluszeit (Minuten)",
+    "Maschinen",
+    "Anschaffungskosten (€)",
+    "Stillstandskostenrate (€/Min)",
+    "Fehlerquote (%)",
+    "Kosten pro fehlerhafte Einheit (€)"
+]
+
+# Most machines per step; the sidebar, the optimizer and the Pareto sweep share it, so an
+# optimized machine count can always be applied to the sidebar
+MAX_MACHINES = 50
+
+# (min, max, step) per field: the input limits of the step grid, also checked on import
+STEP_LIMITS = {
+    "Zykluszeit (Minuten)": (0.1, 10000.0, 0.1),
+    "Maschinen": (1, MAX_MACHINES, 1),
+    "Anschaffungskosten (€)": (0.0, 100000.0, 100.0),
+    "Stillstandskostenrate (€/Min)": (0.0, 10000.0, 0.1),
+    "Fehlerquote (%)": (0.0, 100.0, 0.1),
+    "Kosten pro fehlerhafte Einheit (€)": (0.0, 10000.0, 1.0)
+}
+
+
+def steps_to_arrays(steps):
+    #One float64 row per step field, in STEP_FIELDS order
+    return {field: np.array([float(step[field]) for step in steps]) for field in STEP_FIELDS}
+
+
+# Compact step record for the session state. A dict with seven long German keys costs
+# ~360 bytes per step; the record keeps the name and the numeric fields in fixed slots
+# and only allocates a dict for optional keys (process graph, plant resource). It reads
+# like a dict (step["Maschinen"], step.get(...), dict(step), json via dict(step)), so the
+# model functions accept it unchanged. Records are immutable: edits build a new record
+# with replace(), which lets every session share the default records.
+_STEP_SLOTS = {
+    "Schritt": "name",
+    "Zykluszeit (Minuten)": "cycle_time",
+    "Maschinen": "machines",
+    "Anschaffungskosten (€)": "capital",
+    "Stillstandskostenrate (€/Min)": "idle_rate",
+    "Fehlerquote (%)": "fail_percent",
+    "Kosten pro fehlerhafte Einheit (€)": "fail_cost"
+}
+
+
+class Step(Mapping):
+    __slots__ = tuple(_STEP_SLOTS.values()) + ("extra",)
+
+    def __init__(self, data):
+        extra = {}
+        for key, value in data.items():
+            slot = _STEP_SLOTS.get(key)
+            if slot is None:
+                extra[key] = value
+            else:
+                object.__setattr__(self, slot, value)
+        missing = [key for key, slot in _STEP_SLOTS.items() if not hasattr(self, slot)]
+        if missing:
+            raise ValueError(f"Schritt ohne Feld(er): {', '.join(missing)}")
+        object.__setattr__(self, "extra", extra or None)
+
+    def __getitem__(self, key):
+        slot = _STEP_SLOTS.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from _STEP_SLOTS
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        return len(_STEP_SLOTS) + (len(self.extra) if self.extra is not None else 0)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Step ist unveränderlich, replace() verwenden")
+
+    def __reduce__(self):
+        return Step, (dict(self),)
+
+    def __repr__(self):
+        return f"Step({dict(self)!r})"
+
+    def replace(self, changes, drop=()):
+        # New record with the given keys changed and the keys in drop removed
+        data = {key: value for key, value in self.items() if key not in drop}
+        data.update(changes)
+        return Step(data)
+
+
+def to_steps(steps):
+    # Records are immutable, so existing ones are reused instead of copied
+    return [step if isinstance(step, Step) else Step(step) for step in steps]
+
+
+DEFAULT_STEP_RECORDS = tuple(to_steps(DEFAULT_STEPS))
+
+
+class LineResults(dict):
+    # Results of the session line without a stored DataFrame. The cache keeps the totals,
+    # the step names and one (fields x steps) float64 array; results["df"] builds the full
+    # table (same columns as calculate_line_performance) only when a page displays it.
+    # Nothing is memoized on the object: it is shared through SHARED_STORE, which sized it
+    # once on insert, so callers read results["df"] once per use.
+    __slots__ = ("names", "values")
+
+    def __init__(self, totals, names, values):
+        super().__init__(totals)
+        self.names = tuple(names)
+        self.values = values
+
+    def __missing__(self, key):
+        if key != "df":
+            raise KeyError(key)
+        return self.frame()
+
+    def frame(self):
+        import pandas as pd
+
+        df = pd.DataFrame({"Schritt": list(self.names), **dict(zip(STEP_FIELDS, self.values))})
+        df['Effektive Zykluszeit (Minuten)'] = df['Zykluszeit (Minuten)'] / df['Maschinen']
+        df['fail_rate'] = df['Fehlerquote (%)'] / 100.0
+        idle = self["Runtime"] - self["T_ideal"] * df['Effektive Zykluszeit (Minuten)']
+        df['Idle_Time (Min)'] = idle.where(idle > 0, 0.0)
+        df['Gemeinkosten (€)'] = df['Idle_Time (Min)'] * df['Stillstandskostenrate (€/Min)'] * df['Maschinen']
+        cascade = self.flows()
+        df['Einheiten (Eingang)'] = cascade["units_in"]
+        df['Einheiten (Fehler)'] = cascade["units_failed"]
+        df['Einheiten (Gut)'] = cascade["units_good"]
+        df['Fehlerkosten (Schritt)'] = cascade["fail_cost"]
+        return df
+
+    def flows(self):
+        # Per-step unit flows straight from the stored arrays, without the DataFrame
+        fields = dict(zip(STEP_FIELDS, self.values))
+        cascade = yield_cascade(
+            np.array([self["T_ideal"]]),
+            fields['Fehlerquote (%)'][None, :] / 100.0,
+            fields['Kosten pro fehlerhafte Einheit (€)'][None, :]
+        )
+        return {name: values[0] for name, values in cascade.items() if values.ndim == 2}
+
+
+def yield_cascade(T_ideal, fail_rate, fail_costs):
+    # Defect cascade for (configs x steps) arrays. The running product starts from T_ideal,
+    # so the multiplication order is the same as walking the steps one by one, and the
+    # failure costs are summed left to right for the same reason.
+    n_configs = len(T_ideal)
+    flow = np.cumprod(np.column_stack([T_ideal, 1 - fail_rate]), axis=1)
+    units_in = flow[:, :-1]
+    units_failed = units_in * fail_rate
+    fail_cost = units_failed * fail_costs
+    total_fail_cost = np.add.accumulate(
+        np.column_stack([np.zeros(n_configs), fail_cost]), axis=1
+    )[:, -1]
+    return {
+        "units_in": units_in,
+        "units_failed": units_failed,
+        "units_good": flow[:, 1:],
+        "fail_cost": fail_cost,
+        "total_fail_cost": total_fail_cost,
+        "final_good_units": flow[:, -1]
+    }
+
+
+def calculate_line_performance_batch(cycle_times, machines, capital_costs, idle_rates,
+                                     fail_percents, fail_costs, runtime, sale_price, material_cost,
+                                     max_units=None):
+    # Evaluates N line configurations at once. The per-step inputs are (configs x steps) arrays,
+    # the scalar inputs may be scalars or (configs,) arrays. The arithmetic follows
+    # calculate_line_performance operation by operation so both give identical results.
+    # max_units optionally caps the units started (e.g. by material supply); the line then
+    # runs below its bottleneck rate and the idle time grows accordingly.
+    cycle_times = np.atleast_2d(np.asarray(cycle_times, dtype=float))
+    machines = np.atleast_2d(np.asarray(machines, dtype=float))
+    capital_costs = np.atleast_2d(np.asarray(capital_costs, dtype=float))
+    idle_rates = np.atleast_2d(np.asarray(idle_rates, dtype=float))
+    fail_rate = np.atleast_2d(np.asarray(fail_percents, dtype=float)) / 100.0
+    fail_costs = np.atleast_2d(np.asarray(fail_costs, dtype=float))
+    n_configs = cycle_times.shape[0]
+    runtime = np.broadcast_to(np.asarray(runtime, dtype=float), (n_configs,))
+    sale_price = np.broadcast_to(np.asarray(sale_price, dtype=float), (n_configs,))
+    material_cost = np.broadcast_to(np.asarray(material_cost, dtype=float), (n_configs,))
+
+    eff_cycle = cycle_times / machines
+    T_ideal = (runtime[:, None] / eff_cycle).min(axis=1)
+    if max_units is not None:
+        T_ideal = np.minimum(T_ideal, max_units)
+
+    idle_time = runtime[:, None] - (T_ideal[:, None] * eff_cycle)
+    idle_time = np.where(idle_time > 0, idle_time, 0.0)
+    overhead = idle_time * idle_rates * machines
+
+    cascade = yield_cascade(T_ideal, fail_rate, fail_costs)
+    total_fail_cost = cascade["total_fail_cost"]
+    final_good_units = cascade["final_good_units"]
+    total_capital_cost = np.ascontiguousarray(capital_costs * machines).sum(axis=1)
+    total_overhead_cost = np.ascontiguousarray(overhead).sum(axis=1)
+    total_material_cost = T_ideal * material_cost
+    total_revenue = final_good_units * sale_price
+    total_costs = total_capital_cost + total_overhead_cost + total_fail_cost + total_material_cost
+    profit = total_revenue - total_costs
+
+    return {
+        "Final_Good_Units": final_good_units,
+        "T_ideal": T_ideal,
+        "Total_Capital_Cost": total_capital_cost,
+        "Total_Overhead_Cost": total_overhead_cost,
+        "Total_Fail_Cost": total_fail_cost,
+        "Total_Material_Cost": total_material_cost,
+        "Total_Revenue": total_revenue,
+        "Profit": profit,
+        "Runtime": np.array(runtime)
+    }
+
+
+def calculate_steps_batch(step_lists, runtime, sale_price, material_cost):
+    #Convenience wrapper for a list of step lists that all have the same length
+    stacked = [steps_to_arrays(steps) for steps in step_lists]
+    return calculate_line_performance_batch(
+        *[np.vstack([arrays[field] for arrays in stacked]) for field in STEP_FIELDS],
+        runtime, sale_price, material_cost
+    )
+
+def _canonical_value(value):
+    if isinstance(value, numbers.Real) and not isinstance(value, bool):
+        return float(value)
+    return str(value)
+
+
+def steps_fingerprint(steps, runtime, sale_price, material_cost):
+    # Step order matters (it defines the cascade), key order inside a step does not.
+    # Numbers are hashed as floats so 1 and 1.0 give the same key.
+    payload = {
+        "steps": [
+            [[key, _canonical_value(step[key])] for key in sorted(step)]
+            for step in steps
+        ],
+        "scalars": [_canonical_value(runtime), _canonical_value(sale_price), _canonical_value(material_cost)]
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    #Bounded LRU cache with hit/miss counters
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+
+class _Flight:
+    __slots__ = ("done", "value", "failed")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.failed = False
+
+
+class SharedStore:
+    # Process-wide LRU store for results and figures shared by all sessions. Concurrent
+    # requests for the same missing key are collapsed: the first caller computes, the
+    # others wait for its value. If the computation fails (or the script run is stopped),
+    # a waiting caller computes itself. Bounded by entry count and, with sizeof, by bytes.
+    # Stored values are shared and must not be modified by the caller.
+    def __init__(self, maxsize=256, max_bytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            return None
+
+    def get_or_compute(self, key, compute):
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                flight = self._pending.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._pending[key] = _Flight()
+                    self.misses += 1
+                else:
+                    self.collapsed += 1
+            if leader:
+                return self._compute(key, compute, flight)
+            flight.done.wait()
+            if not flight.failed:
+                return flight.value
+
+    def _compute(self, key, compute, flight):
+        try:
+            value = compute()
+            size = self.sizeof(value) if self.sizeof is not None else 0
+        except BaseException:
+            flight.failed = True
+            with self._lock:
+                del self._pending[key]
+            flight.done.set()
+            raise
+        with self._lock:
+            self._insert(key, value, size)
+            del self._pending[key]
+        flight.value = value
+        flight.done.set()
+        return value
+
+    def put(self, key, value):
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        with self._lock:
+            self._insert(key, value, size)
+
+    def _insert(self, key, value, size):
+        if key in self._entries:
+            self.nbytes -= self._entries[key][1]
+        self._entries[key] = (value, size)
+        self._entries.move_to_end(key)
+        self.nbytes += size
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.maxsize
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+            self.evictions += 1
+
+    def values(self):
+        with self._lock:
+            return [value for value, _ in self._entries.values()]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.collapsed = self.evictions = self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.collapsed
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "collapsed": self.collapsed,
+                "evictions": self.evictions,
+                # Collapsed requests did not compute either
+                "hit_rate": (self.hits + self.collapsed) / lookups if lookups else 0.0
+            }
+
+
+CURVE_MAX_POINTS = 500
+
+
+def curve_time_points(runtime, lead_time, max_points=None):
+    # Minute grid for the cost curves. All curves are linear between 0, the lead time and the
+    # runtime, so with a point budget the breakpoints plus evenly spaced samples draw the
+    # same lines as the full per-minute grid.
+    if max_points is None or runtime + 1 <= max_points:
+        return np.arange(runtime + 1, dtype=float)
+    samples = np.round(np.linspace(0, runtime, max(int(max_points), 2)))
+    breakpoints = [0.0, float(runtime)]
+    if 0 < lead_time < runtime:
+        breakpoints += [float(np.floor(lead_time)), float(np.ceil(lead_time))]
+    return np.unique(np.concatenate([samples, breakpoints]))
+
+
+def line_lead_time(results):
+    # Sum of the effective cycle times; cached session results have the step arrays, so
+    # the DataFrame is not needed
+    if isinstance(results, LineResults):
+        fields = dict(zip(STEP_FIELDS, results.values))
+        return float((fields['Zykluszeit (Minuten)'] / fields['Maschinen']).sum())
+    return results["df"]['Effektive Zykluszeit (Minuten)'].sum()
+
+
+def cost_profit_curves(results, max_points=None):
+    runtime = int(results["Runtime"])
+    lead_time = line_lead_time(results)
+    t = curve_time_points(runtime, lead_time, max_points)
+
+    capital_line = np.full(t.shape, float(results["Total_Capital_Cost"]))
+    overhead_line = results["Total_Overhead_Cost"] * (t / runtime if runtime > 0 else np.ones_like(t))
+
+    if runtime == lead_time:
+        fraction = np.zeros_like(t)
+    elif runtime - lead_time > 0:
+        fraction = np.where(t < lead_time, 0.0, (t - lead_time) / (runtime - lead_time))
+    else:
+        fraction = np.where(t < lead_time, 0.0, 1.0)
+    material_line = results["Total_Material_Cost"] * fraction
+    fail_line = results["Total_Fail_Cost"] * fraction
+    revenue_line = results["Total_Revenue"] * fraction
+
+    profit_line = revenue_line - (capital_line + overhead_line + material_line + fail_line)
+    return {
+        "time": t,
+        "revenue": revenue_line,
+        "material": material_line,
+        "overhead": overhead_line,
+        "fail": fail_line,
+        "capital": capital_line,
+        "profit": profit_line
+    }
+
+
+def payback_runtime(profit, capital, runtime):
+    # Runtime at which the profit reaches zero. Apart from the capital, every total grows
+    # linearly with the runtime (T_ideal = runtime / bottleneck cycle), so the contribution
+    # per minute is (profit + capital) / runtime. Not valid for capped starts (max_units).
+    profit = np.asarray(profit, dtype=float)
+    capital = np.asarray(capital, dtype=float)
+    runtime = np.asarray(runtime, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_minute = np.where(runtime > 0, (profit + capital) / runtime, 0.0)
+        payback = np.where(per_minute > 0, capital / per_minute, np.inf)
+    return np.where(capital <= 0, 0.0, payback)
+
+
+def break_even(kpis, lead_time):
+    # Closed-form break-even of the piecewise-linear cost model, for scalar KPIs or
+    # (configs,) arrays:
+    #   break_even_time  minute within the run from which the profit curve of
+    #                    cost_profit_curves stays >= 0 (NaN if the run ends in a loss)
+    #   payback_runtime  runtime needed for zero profit (inf if the line never pays back)
+    #   min_sale_price   sale price for zero profit at this runtime (inf without good units)
+    runtime = np.asarray(kpis["Runtime"], dtype=float)
+    lead_time = np.asarray(lead_time, dtype=float)
+    capital = np.asarray(kpis["Total_Capital_Cost"], dtype=float)
+    overhead = np.asarray(kpis["Total_Overhead_Cost"], dtype=float)
+    profit = np.asarray(kpis["Profit"], dtype=float)
+    good_units = np.asarray(kpis["Final_Good_Units"], dtype=float)
+    revenue = np.asarray(kpis["Total_Revenue"], dtype=float)
+    gross = revenue - kpis["Total_Material_Cost"] - kpis["Total_Fail_Cost"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Between lead time and runtime the profit curve is a straight line ending at profit;
+        # before the lead time it only falls (capital and overhead)
+        slope = gross / (runtime - lead_time) - overhead / runtime
+        crossing = np.maximum(runtime - profit / slope, lead_time)
+        ramped = (runtime > lead_time) & (profit >= 0) & (slope > 0)
+        no_costs = (capital <= 0) & (overhead <= 0) & (profit >= 0)
+        break_even_time = np.where(ramped, crossing, np.where(no_costs, 0.0, np.nan))
+        min_sale_price = np.where(good_units > 0, (revenue - profit) / good_units, np.inf)
+    return {
+        "Break_Even_Time": break_even_time,
+        "Payback_Runtime": payback_runtime(profit, capital, runtime),
+        "Min_Sale_Price": min_sale_price
+    }
+
+
+def break_even_batch(cycle_times, machines, capital_costs, idle_rates, fail_percents, fail_costs,
+                     runtime, sale_price, material_cost):
+    # Break-even of N configurations at once, arguments as in calculate_line_performance_batch
+    kpis = calculate_line_performance_batch(
+        cycle_times, machines, capital_costs, idle_rates, fail_percents, fail_costs,
+        runtime, sale_price, material_cost
+    )
+    lead_time = (np.atleast_2d(np.asarray(cycle_times, dtype=float))
+                 / np.atleast_2d(np.asarray(machines, dtype=float))).sum(axis=1)
+    return {**kpis, **break_even(kpis, lead_time)}
+
+
+def line_break_even(results):
+    # Break-even of one evaluated line, lead time as in cost_profit_curves
+    return {name: float(value) for name, value in break_even(results, line_lead_time(results)).items()}
+
+
+KPI_NAMES = [
+    "T_ideal",
+    "Final_Good_Units",
+    "Total_Capital_Cost",
+    "Total_Overhead_Cost",
+    "Total_Fail_Cost",
+    "Total_Material_Cost",
+    "Total_Revenue",
+    "Profit"
+]
+
+
+def _evaluate_chunk(chunk):
+    # Scenarios with the same number of steps share one batched call
+    by_length = {}
+    for position, scenario in enumerate(chunk):
+        if not scenario["steps"]:
+            raise ValueError(f"Szenario {scenario.get('name', position)!r} hat keine Schritte")
+        by_length.setdefault(len(scenario["steps"]), []).append(position)
+
+    rows = [None] * len(chunk)
+    for positions in by_length.values():
+        values = np.array([
+            [[float(step[field]) for field in STEP_FIELDS] for step in chunk[p]["steps"]]
+            for p in positions
+        ])
+        kpis = calculate_line_performance_batch(
+            *[values[:, :, a] for a in range(len(STEP_FIELDS))],
+            [chunk[p]["runtime"] for p in positions],
+            [chunk[p]["sale_price"] for p in positions],
+            [chunk[p]["material_cost"] for p in positions]
+        )
+        for i, p in enumerate(positions):
+            rows[p] = {name: float(kpis[name][i]) for name in KPI_NAMES}
+    return rows
+
+
+def evaluate_scenarios(scenarios, chunk_size=1024):
+    # Streams (scenario, kpis) pairs in input order. A scenario is a dict with "steps",
+    # "runtime", "sale_price" and "material_cost"; at most chunk_size scenarios are held at once.
+    chunk = []
+    for scenario in scenarios:
+        chunk.append(scenario)
+        if len(chunk) >= chunk_size:
+            yield from zip(chunk, _evaluate_chunk(chunk))
+            chunk = []
+    if chunk:
+        yield from zip(chunk, _evaluate_chunk(chunk))
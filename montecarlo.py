@@ -0,0 +1,177 @@
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from model import STEP_FIELDS, calculate_line_performance_batch, steps_to_arrays
+
+# Monte Carlo replications of calculate_line_performance. Each replication draws
+# `Zykluszeit (Minuten)` and `Fehlerquote (%)` per step around the configured values. A chunk
+# of replications is evaluated in one batched call, and the chunks are spread over a
+# process pool. The chunking only depends on the number of replications (and an explicit
+# chunk_size), and chunk k always gets child k of the SeedSequence, so the results do not
+# depend on the number of workers or on the order in which chunks finish.
+
+MC_DISTRIBUTIONS = ["normal", "lognormal", "triangular"]
+MC_KPIS = ["Profit", "Final_Good_Units", "T_ideal", "Total_Overhead_Cost", "Total_Fail_Cost"]
+
+_MIN_CYCLE_TIME = 0.1
+# Default number of chunks; enough to keep a pool of typical size balanced
+DEFAULT_CHUNKS = 32
+MAX_CHUNK_SIZE = 50_000
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _draw(rng, base, spread, distribution, size):
+    base = np.broadcast_to(base, size)
+    if spread <= 0:
+        return base.copy()
+    if distribution == "normal":
+        return base * (1 + spread * rng.standard_normal(size))
+    if distribution == "lognormal":
+        sigma2 = math.log1p(spread ** 2)
+        return base * rng.lognormal(-sigma2 / 2, math.sqrt(sigma2), size)
+    if distribution == "triangular":
+        # Symmetric triangle with the same standard deviation as the other two
+        half_width = spread * math.sqrt(6)
+        return base * rng.triangular(1 - half_width, 1, 1 + half_width, size)
+    raise ValueError(f"Unbekannte Verteilung: {distribution}")
+
+
+def _run_chunk(arrays, runtime, sale_price, material_cost, size, seed_seq, cycle_spread, fail_spread, distribution):
+    rng = np.random.default_rng(seed_seq)
+    n_steps = len(arrays["Zykluszeit (Minuten)"])
+    shape = (size, n_steps)
+    per_step = {field: np.broadcast_to(arrays[field], shape) for field in STEP_FIELDS}
+    per_step["Zykluszeit (Minuten)"] = np.maximum(
+        _draw(rng, arrays["Zykluszeit (Minuten)"], cycle_spread, distribution, shape), _MIN_CYCLE_TIME
+    )
+    per_step["Fehlerquote (%)"] = np.clip(
+        _draw(rng, arrays["Fehlerquote (%)"], fail_spread, distribution, shape), 0.0, 100.0
+    )
+    batch = calculate_line_performance_batch(
+        *[per_step[field] for field in STEP_FIELDS], runtime, sale_price, material_cost
+    )
+    return {name: batch[name] for name in MC_KPIS}
+
+
+class RunningStats:
+    # Streaming mean/variance; chunks are merged with Chan's parallel update
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def merge(self, values):
+        n_b = len(values)
+        if n_b == 0:
+            return
+        mean_b = float(np.mean(values))
+        m2_b = float(np.sum((values - mean_b) ** 2))
+        n_a = self.count
+        delta = mean_b - self.mean
+        self.count = n_a + n_b
+        self.mean += delta * n_b / self.count
+        self.m2 += m2_b + delta ** 2 * n_a * n_b / self.count
+
+    def summary(self, z=1.96):
+        std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+        half_width = z * std / math.sqrt(self.count) if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": std,
+            "ci_low": self.mean - half_width,
+            "ci_high": self.mean + half_width
+        }
+
+
+def _get_pool(workers):
+    # One pool per worker count, kept for the lifetime of the process. Sessions share them,
+    # so a pool is never shut down while another run may still wait on its futures.
+    # "spawn" avoids forking the threaded Streamlit server.
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return pool
+
+
+def _chunk_sizes(replications, chunk_size=None):
+    if chunk_size is None:
+        # Independent of the worker count, which would otherwise change the random streams
+        chunk_size = max(1, min(MAX_CHUNK_SIZE, math.ceil(replications / DEFAULT_CHUNKS)))
+    sizes = [chunk_size] * (replications // chunk_size)
+    if replications % chunk_size:
+        sizes.append(replications % chunk_size)
+    return sizes
+
+
+def iter_monte_carlo(steps, runtime, sale_price, material_cost, replications=1000, seed=None,
+                     cycle_spread=0.1, fail_spread=0.2, distribution="normal",
+                     workers=None, chunk_size=None):
+    # Yields a progress dict after every finished chunk. The last one has "done" == "total"
+    # and carries the KPI arrays of all replications in chunk order.
+    workers = workers or os.cpu_count() or 1
+    arrays = steps_to_arrays(steps)
+    sizes = _chunk_sizes(int(replications), chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [
+        (arrays, runtime, sale_price, material_cost, size, seeds[k], cycle_spread, fail_spread, distribution)
+        for k, size in enumerate(sizes)
+    ]
+
+    stats = {name: RunningStats() for name in MC_KPIS}
+    chunks = [None] * len(sizes)
+    done = 0
+
+    def progress(final=False):
+        state = {
+            "done": done,
+            "total": int(replications),
+            "summary": {name: stats[name].summary() for name in MC_KPIS}
+        }
+        if final:
+            state["values"] = {
+                name: np.concatenate([chunk[name] for chunk in chunks]) for name in MC_KPIS
+            }
+            # Recomputed in chunk order so the final numbers are reproducible bit for bit
+            for name, values in state["values"].items():
+                ordered = RunningStats()
+                ordered.merge(values)
+                state["summary"][name] = ordered.summary()
+                state["summary"][name]["p05"], state["summary"][name]["p95"] = np.percentile(values, [5, 95])
+        return state
+
+    if workers == 1 or len(sizes) == 1:
+        for k, chunk_args in enumerate(args):
+            chunks[k] = _run_chunk(*chunk_args)
+            done += sizes[k]
+            for name in MC_KPIS:
+                stats[name].merge(chunks[k][name])
+            if done < replications:
+                yield progress()
+    else:
+        pool = _get_pool(workers)
+        futures = {pool.submit(_run_chunk, *chunk_args): k for k, chunk_args in enumerate(args)}
+        for future in as_completed(futures):
+            k = futures[future]
+            chunks[k] = future.result()
+            done += sizes[k]
+            for name in MC_KPIS:
+                stats[name].merge(chunks[k][name])
+            if done < replications:
+                yield progress()
+    yield progress(final=True)
+
+
+def run_monte_carlo(steps, runtime, sale_price, material_cost, **options):
+    for state in iter_monte_carlo(steps, runtime, sale_price, material_cost, **options):
+        pass
+    return state
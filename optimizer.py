@@ -0,0 +1,70 @@
+import numpy as np
+
+from model import STEP_FIELDS, calculate_line_performance_batch, steps_to_arrays
+
+# Machine allocation search.
+#
+# For a fixed machine vector the cost model gives
+#     T = min_i(runtime * m_i / c_i)
+#     Profit = T * (yield * price - material - fail_cost_per_unit + sum_i c_i * r_i)
+#              - sum_i m_i * (runtime * r_i + a_i)
+# Once a throughput T is fixed, more machines only add capital and idle cost. So every
+# optimum uses the smallest vector that reaches its own T, m_i = ceil(T * c_i / runtime).
+# Its T is always one of runtime * m / c_j (step j is the bottleneck with m machines).
+# Enumerating those steps x max_machines candidates is exact. The evaluation uses the
+# batch cost model, so the reported KPIs are those of calculate_line_performance.
+
+_CEIL_TOLERANCE = 1e-9
+
+
+def candidate_machine_vectors(cycle_times, runtime, max_machines=10):
+    cycle_times = np.asarray(cycle_times, dtype=float)
+    counts = np.arange(1, max_machines + 1, dtype=float)
+    throughputs = np.unique((runtime * counts[None, :] / cycle_times[:, None]).ravel())
+    machines = np.ceil(throughputs[:, None] * cycle_times[None, :] / runtime - _CEIL_TOLERANCE)
+    machines = np.clip(machines, 1, None)
+    machines = machines[(machines <= max_machines).all(axis=1)]
+    return np.unique(machines, axis=0)
+
+
+def evaluate_machine_vectors(steps, machines, runtime, sale_price, material_cost):
+    arrays = steps_to_arrays(steps)
+    shape = machines.shape
+    per_step = {field: np.broadcast_to(arrays[field], shape) for field in STEP_FIELDS}
+    per_step["Maschinen"] = machines
+    return calculate_line_performance_batch(
+        *[per_step[field] for field in STEP_FIELDS], runtime, sale_price, material_cost
+    )
+
+
+def optimize_machines(steps, runtime, sale_price, material_cost, budget=None,
+                      target_units=None, max_machines=10):
+    # Without target_units: maximize Profit with Total_Capital_Cost <= budget.
+    # With target_units: minimize Total_Capital_Cost with Final_Good_Units >= target_units
+    # (and capital <= budget); ties go to the higher profit.
+    cycle_times = [float(step["Zykluszeit (Minuten)"]) for step in steps]
+    machines = candidate_machine_vectors(cycle_times, runtime, max_machines)
+    kpis = evaluate_machine_vectors(steps, machines, runtime, sale_price, material_cost)
+
+    feasible = np.ones(len(machines), dtype=bool)
+    if budget is not None:
+        feasible &= kpis["Total_Capital_Cost"] <= budget
+    if target_units is not None:
+        feasible &= kpis["Final_Good_Units"] >= target_units
+
+    best = None
+    if feasible.any():
+        index = np.flatnonzero(feasible)
+        if target_units is None:
+            best = index[np.argmax(kpis["Profit"][index])]
+        else:
+            order = np.lexsort((-kpis["Profit"][index], kpis["Total_Capital_Cost"][index]))
+            best = index[order[0]]
+
+    return {
+        "machines": machines[best].astype(int) if best is not None else None,
+        "kpis": {name: values[best] for name, values in kpis.items()} if best is not None else None,
+        "candidates": machines,
+        "candidate_kpis": kpis,
+        "feasible": feasible
+    }
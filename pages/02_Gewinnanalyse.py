@@ -1,9 +1,11 @@
 import streamlit as st
 from utils import (
     adjust_process,
-    calculate_line_performance,
+    analyze_line,
     display_summary,
-    plot_cost_profit_analysis_line
+    plot_cost_profit_analysis_line,
+    render_figures,
+    submit_figures
 )
 import plotly.graph_objects as go
 import pandas as pd
@@ -44,14 +46,6 @@ def plot_waterfall(results):
 def plot_cost_breakdown_per_step(results):
     df = results["df"].copy()
     df['Kapitalkosten'] = df['Anschaffungskosten (€)'] * df['Maschinen']
-    fail_costs = []
-    units_in = results["T_ideal"]
-    for _, row in df.iterrows():
-        step_fail = units_in * row['fail_rate']
-        cost = step_fail * row['Kosten pro fehlerhafte Einheit (€)']
-        fail_costs.append(cost)
-        units_in = units_in - step_fail
-    df['Fehlerkosten (Schritt)'] = fail_costs
 
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -85,21 +79,29 @@ def main():
     st.title("Gewinnanalyse")
 
     steps, runtime, sale_price, material_cost = adjust_process()
-    results = calculate_line_performance(steps, runtime, sale_price, material_cost)
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+    results = entry["results"]
 
-    display_summary(results)
-
-    st.markdown("## Kosten- und Gewinnanalyse über die Laufzeit")
-    line_fig = plot_cost_profit_analysis_line(results)
-    st.plotly_chart(line_fig, use_container_width=True)
+    # Figures are built in the background while the KPIs are already on screen
+    futures = submit_figures(entry, {
+        "cost_profit_line": (plot_cost_profit_analysis_line, results),
+        "waterfall": (plot_waterfall, results),
+        "cost_breakdown": (plot_cost_breakdown_per_step, results)
+    })
 
-    st.markdown("## Waterfall-Diagramm")
-    wf_fig = plot_waterfall(results)
-    st.plotly_chart(wf_fig, use_container_width=True)
+    display_summary(results)
 
-    st.markdown("## Kostenaufteilung pro Schritt")
-    breakdown_fig = plot_cost_breakdown_per_step(results)
-    st.plotly_chart(breakdown_fig, use_container_width=True)
+    placeholders = {}
+    for name, title in [
+        ("cost_profit_line", "Kosten- und Gewinnanalyse über die Laufzeit"),
+        ("waterfall", "Waterfall-Diagramm"),
+        ("cost_breakdown", "Kostenaufteilung pro Schritt")
+    ]:
+        st.markdown(f"## {title}")
+        placeholders[name] = st.empty()
+        if not futures[name].done():
+            placeholders[name].caption("Diagramm wird erstellt …")
+    render_figures(placeholders, futures)
 
 if __name__ == "__main__":
     main()
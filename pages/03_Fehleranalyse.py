@@ -1,50 +1,43 @@
 import streamlit as st
 from utils import (
     adjust_process,
-    calculate_line_performance,
-    display_summary
+    analyze_line,
+    cached_figure,
+    display_summary,
+    plot_graph_sankey,
+    shared_result
 )
-import pandas as pd
+from process_graph import ProcessGraph, has_graph, solve_graph
+from model import LineResults
+from sankey import AREA_KEY, line_flows, sankey_links, step_groups
 import plotly.graph_objects as go
 
-def plot_sankey(steps, input_units=100):
-    df = pd.DataFrame(steps)
-    df['fail_rate'] = df['Fehlerquote (%)'] / 100.0
+# From this many steps on, the Sankey starts aggregated
+AGGREGATE_FROM = 30
+GROUPING_LABELS = {
+    "none": "Jeder Schritt einzeln",
+    "area": f"Nach {AREA_KEY} bzw. Blöcken"
+}
 
-    labels = df['Schritt'].tolist()
-    source, target, value = [], [], []
-
-    current_units = input_units
-    for i in range(len(df)):
-        fail_here = current_units * df.loc[i, 'fail_rate']
-        good_out = current_units - fail_here
-
-        if i < len(df) - 1:
-            source.append(i)
-            target.append(i+1)
-            value.append(good_out)
-
-        defect_label = f"Fehler_{df.loc[i, 'Schritt']}"
-        labels.append(defect_label)
-        defect_idx = len(labels) - 1
-        source.append(i)
-        target.append(defect_idx)
-        value.append(fail_here)
-
-        current_units = good_out
-
-    colors = ["blue" if not lbl.startswith("Fehler_") else "red" for lbl in labels]
+def plot_sankey(results, input_units=None, groups=None, min_defect_share=0.0):
+    # Flows come from the shared per-step arrays; input_units rescales them,
+    # e.g. to "per 100 units started". groups (label per step) and min_defect_share
+    # aggregate long lines, see sankey.py.
+    good, failed = line_flows(results)
+    if groups is None:
+        groups = list(results.names) if isinstance(results, LineResults) else results["df"]["Schritt"].tolist()
+    layout, value = sankey_links(good, failed, groups, min_defect_share, input_units)
 
     fig = go.Figure(go.Sankey(
         node=dict(
-            label=labels,
-            color=colors,
+            label=layout["labels"],
+            color=layout["colors"],
             pad=20,
             thickness=30
         ),
         link=dict(
-            source=source,
-            target=target,
+            source=layout["source"],
+            target=layout["target"],
             value=value
         )
     ))
@@ -54,31 +47,97 @@ def plot_sankey(steps, input_units=100):
     )
     return fig
 
+def display_graph_summary(graph_results):
+    # KPIs of the solved process graph, the counterpart of display_summary
+    col1, col2 = st.columns(2)
+    col1.metric("Produzierte Einheiten (in Laufzeit)", f"{graph_results['Final_Good_Units']:.2f} Einheiten")
+    col2.metric("Gesamte Anschaffungskosten (€)", f"€{graph_results['Total_Capital_Cost']:.2f}")
+
+    col3, col4 = st.columns(2)
+    col3.metric("Gesamte Gemeinkosten (€)", f"€{graph_results['Total_Overhead_Cost']:.2f}")
+    col4.metric("Gesamte Fehlerkosten (€)", f"€{graph_results['Total_Fail_Cost']:.2f}")
+
+    col5, col6 = st.columns(2)
+    col5.metric("Gesamte Materialkosten (€)", f"€{graph_results['Total_Material_Cost']:.2f}")
+    col6.metric("Gesamtumsatz (€)", f"€{graph_results['Total_Revenue']:.2f}")
+
+    col7, col8 = st.columns(2)
+    col7.metric("Gewinn (€)", f"€{graph_results['Profit']:.2f}")
+    col8.metric("Engpass", graph_results["Bottleneck"])
+
+
 def main():
     st.title("Fehleranalyse")
 
     steps, runtime, sale_price, material_cost = adjust_process()
-    results = calculate_line_performance(steps, runtime, sale_price, material_cost)
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+    results = entry["results"]
 
-    display_summary(results)
+    # With branches or rework the whole page shows the solved graph, so the KPIs, the
+    # Sankey and the fail cost table always agree
+    graph_results = None
+    try:
+        # Plain serial lines need no graph (and may repeat step names)
+        if has_graph(steps):
+            graph = ProcessGraph(steps)
+            if not graph.is_serial():
+                graph_results = shared_result(
+                    f"{entry['key']}:graph:net", lambda: solve_graph(graph, runtime, sale_price, material_cost)
+                )
+    except ValueError as error:
+        st.error(f"Prozessgraph ungültig, es wird die lineare Linie gezeigt: {error}")
+
+    if graph_results is None:
+        display_summary(results)
+    else:
+        st.caption("Kennzahlen des Prozessgraphen (Verzweigungen bzw. Nacharbeit konfiguriert)")
+        display_graph_summary(graph_results)
 
     st.markdown("## Sankey-Diagramm")
-    sankey_fig = plot_sankey(steps, input_units=100)
+    if graph_results is None:
+        long_line = len(steps) >= AGGREGATE_FROM
+        col1, col2, col3 = st.columns(3)
+        grouping = col1.selectbox(
+            "Gruppierung",
+            list(GROUPING_LABELS),
+            index=1 if long_line else 0,
+            format_func=GROUPING_LABELS.get
+        )
+        block_size = col2.number_input(
+            "Schritte pro Block (ohne Bereich)",
+            min_value=1,
+            max_value=max(1, len(steps)),
+            value=min(10, len(steps)) if long_line else 1,
+            step=1,
+            disabled=grouping == "none"
+        )
+        min_share = col3.number_input(
+            "Kleine Fehlerflüsse zusammenfassen unter (% der Starts)",
+            min_value=0.0,
+            max_value=100.0,
+            value=1.0 if long_line else 0.0,
+            step=0.5
+        )
+        groups = None if grouping == "none" else step_groups(steps, block_size)
+        sankey_fig = cached_figure(
+            entry, f"sankey:{grouping}:{block_size}:{min_share}", plot_sankey,
+            results, None, groups, min_share / 100.0
+        )
+    else:
+        sankey_fig = cached_figure(entry, "graph_sankey_net", plot_graph_sankey, graph_results)
     st.plotly_chart(sankey_fig, use_container_width=True)
 
     st.markdown("## Übersicht über Fehlerkosten")
-    df = results["df"].copy()
-    fail_costs = []
-    units_in = results["T_ideal"]
-    for i, row in df.iterrows():
-        step_fail = units_in * row['fail_rate']
-        cost_step = step_fail * row['Kosten pro fehlerhafte Einheit (€)']
-        fail_costs.append(cost_step)
-        units_in = units_in - step_fail
-
-    df['Fehlerkosten (geschätzt)'] = fail_costs
-    st.dataframe(df[['Schritt','Fehlerquote (%)','Kosten pro fehlerhafte Einheit (€)','Fehlerkosten (geschätzt)']])
-    st.write(f"**Gesamte Fehlerkosten (geschätzt)**: €{sum(fail_costs):.2f}")
+    if graph_results is None:
+        df = results["df"]
+        st.dataframe(df[['Schritt','Fehlerquote (%)','Kosten pro fehlerhafte Einheit (€)','Einheiten (Eingang)','Einheiten (Fehler)','Fehlerkosten (Schritt)']])
+        st.write(f"**Gesamte Fehlerkosten**: €{results['Total_Fail_Cost']:.2f}")
+    else:
+        df = graph_results["df"][['Schritt','Einheiten','Fehlerhafte Einheiten','Nacharbeit','Ausschuss','Fehlerkosten (Schritt)']].copy()
+        df.insert(1, 'Fehlerquote (%)', [step['Fehlerquote (%)'] for step in steps])
+        df.insert(2, 'Kosten pro fehlerhafte Einheit (€)', [step['Kosten pro fehlerhafte Einheit (€)'] for step in steps])
+        st.dataframe(df)
+        st.write(f"**Gesamte Fehlerkosten**: €{graph_results['Total_Fail_Cost']:.2f}")
 
 if __name__ == "__main__":
     main()
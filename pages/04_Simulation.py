@@ -0,0 +1,127 @@
+import streamlit as st
+from utils import (
+    adjust_process,
+    analyze_line,
+    shared_result
+)
+from simulation import DISTRIBUTIONS, run_replications
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+DISTRIBUTION_LABELS = {
+    "deterministic": "Deterministisch",
+    "exponential": "Exponentiell",
+    "gamma": "Gamma",
+    "lognormal": "Lognormal"
+}
+
+
+def plot_lead_time_histogram(lead_times):
+    # Binned on the server so the payload does not grow with the number of units
+    counts, edges = np.histogram(lead_times, bins=50)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), marker_color='lightskyblue'))
+    fig.update_layout(
+        title="Verteilung der Durchlaufzeiten",
+        xaxis_title='Durchlaufzeit (Min)',
+        yaxis_title='Einheiten',
+        template='plotly_white'
+    )
+    return fig
+
+
+def plot_step_states(per_step):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=per_step["Schritt"], y=per_step["Auslastung"], name='Bearbeitung', marker_color='mediumseagreen'))
+    fig.add_trace(go.Bar(x=per_step["Schritt"], y=per_step["Blockiert"], name='Blockiert', marker_color='tomato'))
+    fig.add_trace(go.Bar(x=per_step["Schritt"], y=per_step["Verhungert"], name='Verhungert', marker_color='lightgray'))
+    fig.update_layout(
+        title="Maschinenzustände pro Schritt",
+        xaxis_title='Schritt',
+        yaxis_title='Anteil der Laufzeit',
+        yaxis_tickformat='.0%',
+        barmode='stack',
+        template='plotly_white'
+    )
+    return fig
+
+
+def main():
+    st.title("Simulation")
+
+    steps, runtime, sale_price, material_cost = adjust_process()
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+    results = entry["results"]
+
+    with st.form("simulation_settings"):
+        col1, col2, col3 = st.columns(3)
+        replications = col1.number_input("Replikationen", min_value=1, max_value=500, value=20, step=1)
+        buffer_size = col2.number_input("Puffergröße zwischen Schritten", min_value=0, max_value=1000, value=5, step=1)
+        seed = col3.number_input("Startwert (Seed)", min_value=0, max_value=2**31 - 1, value=42, step=1)
+        col4, col5 = st.columns(2)
+        distribution = col4.selectbox(
+            "Verteilung der Zykluszeiten",
+            options=DISTRIBUTIONS,
+            index=DISTRIBUTIONS.index("gamma"),
+            format_func=DISTRIBUTION_LABELS.get
+        )
+        cv = col5.number_input("Variationskoeffizient", min_value=0.0, max_value=3.0, value=0.5, step=0.1)
+        st.form_submit_button("Simulation starten")
+
+    key = f"{entry['key']}:sim:{replications}:{buffer_size}:{seed}:{distribution}:{cv}"
+    with st.spinner("Simuliere..."):
+        sim = shared_result(key, lambda: run_replications(
+            steps, runtime, sale_price, material_cost,
+            replications=int(replications),
+            seed=int(seed),
+            buffer_size=int(buffer_size),
+            distribution=distribution,
+            cv=cv
+        ))
+
+    summary = sim["summary"]
+    st.markdown("## Ergebnisse (Mittelwert und 95%-Konfidenzintervall)")
+    col1, col2 = st.columns(2)
+    good = summary["Final_Good_Units"]
+    col1.metric(
+        "Gute Einheiten",
+        f"{good['mean']:.1f}",
+        f"{good['mean'] - results['Final_Good_Units']:+.1f} ggü. Analytik",
+        delta_color="off"
+    )
+    col1.caption(f"KI: {good['ci_low']:.1f} – {good['ci_high']:.1f}")
+    profit = summary["Profit"]
+    col2.metric(
+        "Gewinn (€)",
+        f"€{profit['mean']:.2f}",
+        f"{profit['mean'] - results['Profit']:+.2f} ggü. Analytik",
+        delta_color="off"
+    )
+    col2.caption(f"KI: €{profit['ci_low']:.2f} – €{profit['ci_high']:.2f}")
+
+    col3, col4 = st.columns(2)
+    col3.metric("Mittlerer Bestand (WIP)", f"{summary['WIP_Mean']['mean']:.2f} Einheiten")
+    lead_times = sim["Lead_Times"]
+    if len(lead_times):
+        p50, p95 = np.percentile(lead_times, [50, 95])
+        col4.metric("Durchlaufzeit (Median / 95%)", f"{p50:.1f} / {p95:.1f} Min")
+
+    st.markdown("## Zustände pro Schritt")
+    st.plotly_chart(plot_step_states(sim["per_step"]), use_container_width=True)
+    df = pd.DataFrame(sim["per_step"])
+    st.dataframe(df.style.format({
+        "Bearbeitet": "{:.1f}",
+        "Ausschuss": "{:.1f}",
+        "Auslastung": "{:.1%}",
+        "Blockiert": "{:.1%}",
+        "Verhungert": "{:.1%}",
+        "Puffer_Mittel": "{:.2f}"
+    }))
+
+    if len(lead_times):
+        st.markdown("## Durchlaufzeiten")
+        st.plotly_chart(plot_lead_time_histogram(lead_times), use_container_width=True)
+
+
+if __name__ == "__main__":
+    main()
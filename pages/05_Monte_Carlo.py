@@ -0,0 +1,89 @@
+import os
+import streamlit as st
+from utils import (
+    adjust_process,
+    analyze_line,
+    get_result_cache
+)
+from montecarlo import MC_DISTRIBUTIONS, iter_monte_carlo
+import numpy as np
+import plotly.graph_objects as go
+
+DISTRIBUTION_LABELS = {
+    "normal": "Normal",
+    "lognormal": "Lognormal",
+    "triangular": "Dreieck"
+}
+
+
+def plot_profit_distribution(values):
+    counts, edges = np.histogram(values, bins=60)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), marker_color='gold'))
+    fig.update_layout(
+        title="Verteilung des Gewinns",
+        xaxis_title='Gewinn (€)',
+        yaxis_title='Replikationen',
+        template='plotly_white'
+    )
+    return fig
+
+
+def show_summary(container, state, results):
+    profit = state["summary"]["Profit"]
+    good = state["summary"]["Final_Good_Units"]
+    with container.container():
+        st.progress(state["done"] / state["total"], text=f"{state['done']} von {state['total']} Replikationen")
+        col1, col2 = st.columns(2)
+        col1.metric("Gewinn (€, Mittelwert)", f"€{profit['mean']:.2f}", f"{profit['mean'] - results['Profit']:+.2f} ggü. Analytik", delta_color="off")
+        col1.caption(f"95%-KI: €{profit['ci_low']:.2f} – €{profit['ci_high']:.2f}")
+        col2.metric("Gute Einheiten (Mittelwert)", f"{good['mean']:.2f}", f"{good['mean'] - results['Final_Good_Units']:+.2f} ggü. Analytik", delta_color="off")
+        col2.caption(f"95%-KI: {good['ci_low']:.2f} – {good['ci_high']:.2f}")
+        if "p05" in profit:
+            col3, col4 = st.columns(2)
+            col3.metric("Gewinn 5%–95%", f"€{profit['p05']:.0f} – €{profit['p95']:.0f}")
+            col4.metric("Gute Einheiten 5%–95%", f"{good['p05']:.1f} – {good['p95']:.1f}")
+
+
+def main():
+    st.title("Monte-Carlo-Analyse")
+
+    steps, runtime, sale_price, material_cost = adjust_process()
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+    results = entry["results"]
+
+    with st.form("monte_carlo_settings"):
+        col1, col2, col3 = st.columns(3)
+        replications = col1.number_input("Replikationen", min_value=100, max_value=5_000_000, value=10_000, step=1000)
+        cycle_spread = col2.number_input("Streuung Zykluszeit (rel. Std.)", min_value=0.0, max_value=1.0, value=0.1, step=0.01)
+        fail_spread = col3.number_input("Streuung Fehlerquote (rel. Std.)", min_value=0.0, max_value=1.0, value=0.2, step=0.01)
+        col4, col5, col6 = st.columns(3)
+        distribution = col4.selectbox("Verteilung", options=MC_DISTRIBUTIONS, format_func=DISTRIBUTION_LABELS.get)
+        seed = col5.number_input("Startwert (Seed)", min_value=0, max_value=2**31 - 1, value=42, step=1)
+        workers = col6.number_input("Prozesse", min_value=1, max_value=os.cpu_count() or 1, value=os.cpu_count() or 1, step=1)
+        st.form_submit_button("Analyse starten")
+
+    cache = get_result_cache()
+    # The worker count does not change the result, so it is not part of the key
+    key = f"{entry['key']}:mc:{replications}:{cycle_spread}:{fail_spread}:{distribution}:{seed}"
+    placeholder = st.empty()
+    state = cache.get(key)
+    if state is None:
+        for state in iter_monte_carlo(
+            steps, runtime, sale_price, material_cost,
+            replications=int(replications),
+            seed=int(seed),
+            cycle_spread=cycle_spread,
+            fail_spread=fail_spread,
+            distribution=distribution,
+            workers=int(workers)
+        ):
+            show_summary(placeholder, state, results)
+        cache.put(key, state)
+    else:
+        show_summary(placeholder, state, results)
+
+    st.plotly_chart(plot_profit_distribution(state["values"]["Profit"]), use_container_width=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import streamlit as st
+from utils import (
+    MAX_MACHINES,
+    adjust_process,
+    analyze_line,
+    load_steps,
+    shared_result
+)
+from optimizer import optimize_machines
+import pandas as pd
+import plotly.graph_objects as go
+
+MODE_PROFIT = "Gewinn maximieren"
+MODE_CAPITAL = "Anschaffungskosten für Zielmenge minimieren"
+
+
+def apply_machines(machines):
+    steps = [dict(step, Maschinen=int(m)) for step, m in zip(st.session_state.steps, machines)]
+    load_steps(steps)
+
+
+def plot_candidates(opt, current):
+    kpis = opt["candidate_kpis"]
+    feasible = opt["feasible"]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=kpis["Total_Capital_Cost"][~feasible], y=kpis["Profit"][~feasible],
+        mode='markers', name='Unzulässig', marker=dict(color='lightgray', size=6)
+    ))
+    fig.add_trace(go.Scatter(
+        x=kpis["Total_Capital_Cost"][feasible], y=kpis["Profit"][feasible],
+        mode='markers', name='Zulässig', marker=dict(color='lightskyblue', size=7)
+    ))
+    fig.add_trace(go.Scatter(
+        x=[current["Total_Capital_Cost"]], y=[current["Profit"]],
+        mode='markers', name='Aktuell', marker=dict(color='black', size=12, symbol='x')
+    ))
+    if opt["kpis"] is not None:
+        fig.add_trace(go.Scatter(
+            x=[opt["kpis"]["Total_Capital_Cost"]], y=[opt["kpis"]["Profit"]],
+            mode='markers', name='Optimum', marker=dict(color='gold', size=14, symbol='star')
+        ))
+    fig.update_layout(
+        title="Kandidaten: Anschaffungskosten und Gewinn",
+        xaxis_title='Gesamte Anschaffungskosten (€)',
+        yaxis_title='Gewinn (€)',
+        template='plotly_white'
+    )
+    return fig
+
+
+def main():
+    st.title("Maschinenoptimierung")
+
+    steps, runtime, sale_price, material_cost = adjust_process()
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+    results = entry["results"]
+
+    mode = st.radio("Ziel", [MODE_PROFIT, MODE_CAPITAL], horizontal=True)
+    col1, col2, col3 = st.columns(3)
+    use_budget = col1.checkbox("Budget begrenzen", value=True)
+    budget = col1.number_input(
+        "Budget Anschaffungskosten (€)",
+        min_value=0.0,
+        value=float(max(results["Total_Capital_Cost"] * 3, 1000.0)),
+        step=100.0,
+        disabled=not use_budget
+    )
+    max_machines = col2.number_input("Max. Maschinen pro Schritt", min_value=1, max_value=MAX_MACHINES, value=10, step=1)
+    target_units = None
+    if mode == MODE_CAPITAL:
+        target_units = col3.number_input(
+            "Ziel: gute Einheiten",
+            min_value=0.0,
+            value=float(round(results["Final_Good_Units"] * 1.5, 1)),
+            step=1.0
+        )
+
+    key = f"{entry['key']}:opt:{mode}:{use_budget and budget}:{max_machines}:{target_units}"
+    opt = shared_result(key, lambda: optimize_machines(
+        steps, runtime, sale_price, material_cost,
+        budget=budget if use_budget else None,
+        target_units=target_units,
+        max_machines=int(max_machines)
+    ))
+
+    if opt["machines"] is None:
+        st.warning("Keine zulässige Maschinenverteilung für diese Vorgaben gefunden.")
+    else:
+        best = opt["kpis"]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Gewinn (€)", f"€{best['Profit']:.2f}", f"{best['Profit'] - results['Profit']:+.2f}")
+        col2.metric(
+            "Gesamte Anschaffungskosten (€)",
+            f"€{best['Total_Capital_Cost']:.2f}",
+            f"{best['Total_Capital_Cost'] - results['Total_Capital_Cost']:+.2f}",
+            delta_color="inverse"
+        )
+        col3.metric(
+            "Produzierte Einheiten",
+            f"{best['Final_Good_Units']:.2f}",
+            f"{best['Final_Good_Units'] - results['Final_Good_Units']:+.2f}"
+        )
+
+        df = pd.DataFrame({
+            "Schritt": [step["Schritt"] for step in steps],
+            "Maschinen (aktuell)": [int(step["Maschinen"]) for step in steps],
+            "Maschinen (optimal)": opt["machines"]
+        })
+        st.dataframe(df, hide_index=True)
+        st.button("Optimale Verteilung übernehmen", on_click=apply_machines, args=(opt["machines"].tolist(),))
+
+    st.caption(f"{len(opt['candidates'])} Kandidaten exakt ausgewertet.")
+    st.plotly_chart(plot_candidates(opt, results), use_container_width=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import streamlit as st
+from utils import (
+    adjust_process,
+    analyze_line,
+    cached_figure,
+    shared_result
+)
+from sensitivity import MAX_PCT, sensitivity_analysis
+import plotly.graph_objects as go
+
+
+def plot_tornado(sens, top_n=15):
+    df = sens["df"].head(top_n).iloc[::-1]
+    base = sens["Profit"]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=df["Parameter"], x=df["Gewinn (-)"] - base, base=base,
+        orientation='h', name=f"-{sens['pct']:g}%", marker_color='tomato'
+    ))
+    fig.add_trace(go.Bar(
+        y=df["Parameter"], x=df["Gewinn (+)"] - base, base=base,
+        orientation='h', name=f"+{sens['pct']:g}%", marker_color='mediumseagreen'
+    ))
+    fig.add_vline(x=base, line_color='gray', line_dash='dot')
+    fig.update_layout(
+        title="Tornado-Diagramm: Einfluss auf den Gewinn",
+        xaxis_title='Gewinn (€)',
+        barmode='overlay',
+        height=max(400, 28 * len(df) + 150),
+        template='plotly_white'
+    )
+    return fig
+
+
+def main():
+    st.title("Sensitivitätsanalyse")
+
+    steps, runtime, sale_price, material_cost = adjust_process()
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+
+    col1, col2 = st.columns(2)
+    pct = col1.number_input("Variation (±%)", min_value=0.1, max_value=MAX_PCT, value=10.0, step=1.0)
+    top_n = col2.number_input("Angezeigte Parameter", min_value=1, max_value=500, value=15, step=1)
+
+    key = f"{entry['key']}:sens:{pct}"
+    sens = shared_result(key, lambda: sensitivity_analysis(steps, runtime, sale_price, material_cost, pct))
+
+    st.caption("Maschinenzahlen werden stetig variiert, um den Grenzeffekt sichtbar zu machen.")
+    tornado_fig = cached_figure(entry, f"tornado_{pct}_{top_n}", plot_tornado, sens, int(top_n))
+    st.plotly_chart(tornado_fig, use_container_width=True)
+
+    st.dataframe(sens["df"].style.format({
+        "Gewinn (-)": "€{:,.2f}",
+        "Gewinn (+)": "€{:,.2f}",
+        "Spanne": "€{:,.2f}"
+    }), hide_index=True)
+
+
+if __name__ == "__main__":
+    main()
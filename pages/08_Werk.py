@@ -0,0 +1,80 @@
+import json
+import streamlit as st
+from plant import Plant, example_plant
+import plotly.graph_objects as go
+
+
+def plot_resource_utilization(resources):
+    colors = ['tomato' if u > 1 else 'lightskyblue' for u in resources["Auslastung"]]
+    fig = go.Figure(go.Bar(x=resources["Ressource"], y=resources["Auslastung"], marker_color=colors))
+    fig.add_hline(y=1.0, line_dash='dot', line_color='gray')
+    fig.update_layout(
+        title="Auslastung der gemeinsamen Ressourcen",
+        yaxis_title='Bedarf / Kapazität',
+        yaxis_tickformat='.0%',
+        template='plotly_white'
+    )
+    return fig
+
+
+def load_plant(uploaded):
+    # The Plant object is kept per uploaded file so reruns do not rebuild it
+    source = uploaded.file_id if uploaded is not None else "example"
+    if st.session_state.get("plant_source") != source:
+        if uploaded is None:
+            st.session_state.plant = example_plant()
+        else:
+            st.session_state.plant = Plant.from_dict(json.loads(uploaded.getvalue()))
+        st.session_state.plant_source = source
+    return st.session_state.plant
+
+
+def main():
+    st.title("Werksübersicht")
+
+    uploaded = st.file_uploader("Werksdatei (JSON)", type=["json"])
+    if uploaded is None:
+        st.caption("Ohne Datei wird ein Beispielwerk mit 12 Linien und gemeinsamen Maschinenpools gezeigt.")
+    plant = load_plant(uploaded)
+    results = plant.results()
+    totals = results["totals"]
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Gewinn gesamt (€)", f"€{totals['Profit']:,.2f}")
+    col2.metric("Gemeinkosten gesamt (€)", f"€{totals['Total_Overhead_Cost']:,.2f}")
+    col3.metric("Gute Einheiten gesamt", f"{totals['Final_Good_Units']:,.1f}")
+
+    resource, utilization = results["bottleneck"]
+    if resource is not None:
+        message = f"Werksweiter Engpass: **{resource}** mit {utilization:.0%} Auslastung."
+        if utilization > 1:
+            st.warning(message)
+        else:
+            st.info(message)
+    overloaded = [name for name, factor in results["pool_factors"].items() if factor < 1]
+    if overloaded:
+        st.caption(
+            f"Überlastete Ressourcen ({', '.join(overloaded)}) werden anteilig zugeteilt; "
+            "die betroffenen Linien starten entsprechend weniger Einheiten (Spalte 'Drosselung')."
+        )
+    if results["material_factor"] < 1:
+        st.caption(f"Material reicht für {results['material_factor']:.0%} der möglichen Starts; alle Linien werden gedrosselt.")
+
+    if len(results["resources"]):
+        st.plotly_chart(plot_resource_utilization(results["resources"]), use_container_width=True)
+
+    st.markdown("## Linien")
+    st.dataframe(results["lines"].style.format({
+        "T_ideal": "{:.2f}",
+        "Final_Good_Units": "{:.2f}",
+        "Total_Capital_Cost": "€{:,.2f}",
+        "Total_Overhead_Cost": "€{:,.2f}",
+        "Total_Fail_Cost": "€{:,.2f}",
+        "Total_Material_Cost": "€{:,.2f}",
+        "Total_Revenue": "€{:,.2f}",
+        "Profit": "€{:,.2f}"
+    }), hide_index=True)
+
+
+if __name__ == "__main__":
+    main()
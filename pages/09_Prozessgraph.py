@@ -0,0 +1,114 @@
+import streamlit as st
+from utils import (
+    adjust_process,
+    analyze_line,
+    bump_steps_version,
+    cached_figure,
+    plot_graph_sankey,
+    shared_result
+)
+from process_graph import GRAPH_KEYS, REWORK_KEY, REWORK_TARGET_KEY, SUCCESSOR_KEY, ProcessGraph, solve_graph
+import pandas as pd
+
+BASIS_LABELS = {
+    "net": "Tatsächliche Mengen (mit Ausschuss und Nacharbeit)",
+    "gross": "Fehlerfreie Mengen (wie das lineare Modell)"
+}
+
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)) or value == "":
+        return None
+    return value
+
+
+def edit_graph(steps):
+    # The graph keys are plain step keys; on submit, an edited row replaces its step record.
+    # The key carries the steps version, so edits never outlive the rows they were made on.
+    df = pd.DataFrame({
+        "Schritt": [step["Schritt"] for step in steps],
+        SUCCESSOR_KEY: [step.get(SUCCESSOR_KEY) for step in steps],
+        REWORK_KEY: [step.get(REWORK_KEY) for step in steps],
+        REWORK_TARGET_KEY: [step.get(REWORK_TARGET_KEY) for step in steps]
+    })
+    names = df["Schritt"].tolist()
+    with st.form("graph_form", border=False):
+        edited = st.data_editor(
+            df,
+            hide_index=True,
+            disabled=["Schritt"],
+            column_config={
+                SUCCESSOR_KEY: st.column_config.TextColumn(
+                    help="Leer = nächster Schritt, '-' = Fertigware, mehrere mit ';' und optional ':Anteil'"
+                ),
+                REWORK_KEY: st.column_config.NumberColumn(min_value=0.0, max_value=100.0, step=1.0),
+                REWORK_TARGET_KEY: st.column_config.SelectboxColumn(options=names)
+            },
+            key=f"graph_editor_{st.session_state.get('steps_version', 0)}"
+        )
+        submitted = st.form_submit_button("Verknüpfungen übernehmen")
+    if not submitted:
+        return
+    changed = False
+    for index, (step, (_, row)) in enumerate(zip(steps, edited.iterrows())):
+        values = {key: _clean(row[key]) for key in GRAPH_KEYS}
+        if any(step.get(key) != value for key, value in values.items()):
+            steps[index] = step.replace(
+                {key: value for key, value in values.items() if value is not None},
+                drop=[key for key, value in values.items() if value is None]
+            )
+            changed = True
+    if changed:
+        bump_steps_version()
+
+
+def main():
+    st.title("Prozessgraph")
+
+    steps, runtime, sale_price, material_cost = adjust_process()
+    st.markdown("## Verknüpfungen")
+    edit_graph(steps)
+
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+    basis = st.radio("Kapazitätsbasis", list(BASIS_LABELS), format_func=BASIS_LABELS.get, horizontal=True)
+
+    try:
+        graph = ProcessGraph(steps)
+    except ValueError as error:
+        st.error(str(error))
+        return
+
+    key = f"{entry['key']}:graph:{basis}"
+    try:
+        graph_results = shared_result(
+            key, lambda: solve_graph(graph, runtime, sale_price, material_cost, capacity_basis=basis)
+        )
+    except ValueError as error:
+        st.error(str(error))
+        return
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Gute Einheiten", f"{graph_results['Final_Good_Units']:.2f}")
+    col2.metric("Gewinn (€)", f"€{graph_results['Profit']:.2f}")
+    col3.metric("Engpass", graph_results["Bottleneck"])
+
+    st.plotly_chart(
+        cached_figure(entry, f"graph_sankey_{basis}", plot_graph_sankey, graph_results),
+        use_container_width=True
+    )
+    st.dataframe(graph_results["df"].style.format({
+        "Fluss pro Start": "{:.3f}",
+        "Einheiten": "{:.2f}",
+        "Fehlerhafte Einheiten": "{:.2f}",
+        "Nacharbeit": "{:.2f}",
+        "Ausschuss": "{:.2f}",
+        "Fertigware": "{:.2f}",
+        "Auslastung": "{:.1%}",
+        "Idle_Time (Min)": "{:.2f}",
+        "Gemeinkosten (€)": "€{:,.2f}",
+        "Fehlerkosten (Schritt)": "€{:,.2f}"
+    }), hide_index=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import streamlit as st
+from utils import adjust_process, analyze_line, display_summary, load_steps
+from scenario_store import ScenarioStore
+
+SORT_OPTIONS = {
+    "Gewinn": "profit",
+    "Anschaffungskosten": "total_capital_cost",
+    "Fehlerkosten": "total_fail_cost",
+    "Gute Einheiten": "final_good_units",
+    "Name": "name",
+    "Gespeichert": "created_at"
+}
+
+
+@st.cache_resource
+def get_store():
+    # One store (and SQLite connection) per server process
+    return ScenarioStore()
+
+
+def load_scenario(store, name):
+    scenario = store.load(name)
+    load_steps(scenario["steps"])
+    st.session_state.sidebar_runtime = int(scenario["runtime"])
+    st.session_state.sidebar_sale_price = float(scenario["sale_price"])
+    st.session_state.sidebar_mat_cost = float(scenario["material_cost"])
+
+
+def main():
+    st.title("Szenarien")
+
+    steps, runtime, sale_price, material_cost = adjust_process()
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+    store = get_store()
+
+    st.markdown("## Aktuelle Konfiguration speichern")
+    col1, col2 = st.columns([3, 1])
+    name = col1.text_input("Name des Szenarios")
+    if col2.button("Speichern", disabled=not name.strip()):
+        exists = name.strip() in store.names()
+        # The session already has the KPIs of these inputs
+        store.save(name.strip(), steps, runtime, sale_price, material_cost, kpis=entry["results"])
+        st.success(f"Szenario '{name.strip()}' {'überschrieben' if exists else 'gespeichert'}.")
+    display_summary(entry["results"])
+
+    names = store.names()
+    if not names:
+        st.info("Noch keine Szenarien gespeichert.")
+        return
+
+    st.markdown(f"## Gespeicherte Szenarien ({len(names)})")
+    col1, col2, col3, col4 = st.columns(4)
+    sort_label = col1.selectbox("Sortieren nach", list(SORT_OPTIONS))
+    descending = col2.checkbox("Absteigend", value=True)
+    use_capital = col3.checkbox("Anschaffungskosten begrenzen")
+    max_capital = col3.number_input("Max. Anschaffungskosten (€)", min_value=0.0, value=10000.0, step=500.0, disabled=not use_capital)
+    limit = col4.number_input("Anzahl", min_value=1, max_value=10000, value=50, step=10)
+    table = store.query(
+        SORT_OPTIONS[sort_label],
+        descending=descending,
+        limit=limit,
+        max_capital=max_capital if use_capital else None
+    )
+    st.dataframe(table.style.format({
+        "T_ideal": "{:.2f}",
+        "Final_Good_Units": "{:.2f}",
+        "Total_Capital_Cost": "€{:,.2f}",
+        "Total_Overhead_Cost": "€{:,.2f}",
+        "Total_Fail_Cost": "€{:,.2f}",
+        "Total_Material_Cost": "€{:,.2f}",
+        "Total_Revenue": "€{:,.2f}",
+        "Profit": "€{:,.2f}"
+    }), hide_index=True)
+
+    col1, col2, col3 = st.columns([3, 1, 1])
+    selected = col1.selectbox("Szenario", names)
+    col2.button("Laden", on_click=load_scenario, args=(store, selected))
+    if col3.button("Löschen"):
+        store.delete(selected)
+        st.rerun()
+
+    st.markdown("## Vergleich")
+    compare = st.multiselect("Szenarien vergleichen", names, max_selections=6)
+    if len(compare) >= 2:
+        only_changes = st.checkbox("Nur Abweichungen anzeigen", value=True)
+        diff = store.diff(compare, only_changes=only_changes)
+        st.dataframe(
+            diff.drop(columns="Abweichung").style.format(precision=2, na_rep="–"),
+            use_container_width=True
+        )
+
+
+if __name__ == "__main__":
+    main()
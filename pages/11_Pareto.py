@@ -0,0 +1,108 @@
+import streamlit as st
+from utils import (
+    MAX_MACHINES,
+    adjust_process,
+    analyze_line,
+    load_steps,
+    shared_result
+)
+from pareto import candidate_count, pareto_front
+from model import payback_runtime
+import pandas as pd
+import plotly.graph_objects as go
+
+CANDIDATE_OPTIONS = [10_000, 100_000, 1_000_000]
+
+
+def apply_selection(front):
+    # on_select callback: runs before the rerun, so the sidebar picks up the new steps
+    points = st.session_state.pareto_chart.selection.points
+    indices = [point["customdata"][0] for point in points if point.get("customdata")]
+    if indices:
+        machines = front["machines"][indices[0]]
+        steps = [dict(step, Maschinen=int(m)) for step, m in zip(st.session_state.steps, machines)]
+        load_steps(steps)
+
+
+def plot_front(front, current):
+    kpis = front["kpis"]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=kpis["Total_Capital_Cost"],
+        y=kpis["Profit"],
+        mode='markers',
+        name='Pareto-Front',
+        customdata=[[i] for i in range(len(kpis["Profit"]))],
+        marker=dict(
+            size=9,
+            color=kpis["Total_Fail_Cost"],
+            colorscale='Reds',
+            colorbar=dict(title='Fehlerkosten (€)')
+        ),
+        hovertemplate=(
+            'Anschaffungskosten: €%{x:,.2f}<br>Gewinn: €%{y:,.2f}<br>'
+            'Fehlerkosten: €%{marker.color:,.2f}<extra></extra>'
+        )
+    ))
+    fig.add_trace(go.Scatter(
+        x=[current["Total_Capital_Cost"]], y=[current["Profit"]],
+        mode='markers', name='Aktuell', marker=dict(color='black', size=12, symbol='x')
+    ))
+    fig.update_layout(
+        title="Nicht dominierte Konfigurationen",
+        xaxis_title='Gesamte Anschaffungskosten (€)',
+        yaxis_title='Gewinn (€)',
+        template='plotly_white',
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, x=0)
+    )
+    return fig
+
+
+def main():
+    st.title("Pareto-Analyse")
+
+    steps, runtime, sale_price, material_cost = adjust_process()
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+    results = entry["results"]
+
+    col1, col2 = st.columns(2)
+    max_machines = col1.number_input("Max. Maschinen pro Schritt", min_value=1, max_value=MAX_MACHINES, value=10, step=1)
+    max_candidates = col2.selectbox("Max. Kandidaten", CANDIDATE_OPTIONS, index=2, format_func=lambda n: f"{n:,}")
+
+    key = f"{entry['key']}:pareto:{max_machines}:{max_candidates}"
+    with st.spinner("Konfigurationen werden ausgewertet..."):
+        front = shared_result(
+            key, lambda: pareto_front(steps, runtime, sale_price, material_cost, max_machines, max_candidates)
+        )
+
+    if front["exhaustive"]:
+        st.caption(f"Alle {front['n_candidates']:,} Konfigurationen ausgewertet, {len(front['machines'])} davon nicht dominiert.")
+    else:
+        st.caption(
+            f"{front['n_candidates']:,} von {candidate_count(len(steps), max_machines):,} Konfigurationen "
+            f"zufällig ausgewertet, {len(front['machines'])} davon nicht dominiert."
+        )
+
+    st.plotly_chart(
+        plot_front(front, results),
+        use_container_width=True,
+        key="pareto_chart",
+        on_select=lambda: apply_selection(front),
+        selection_mode="points"
+    )
+    st.caption("Ein Klick auf einen Punkt übernimmt dessen Maschinenanzahl in die Seitenleiste.")
+
+    table = pd.DataFrame(front["machines"], columns=[step["Schritt"] for step in steps])
+    for name, values in front["kpis"].items():
+        table[name] = values
+    table["Payback_Runtime"] = payback_runtime(front["kpis"]["Profit"], front["kpis"]["Total_Capital_Cost"], runtime)
+    st.dataframe(table.style.format({
+        "Profit": "€{:,.2f}",
+        "Total_Capital_Cost": "€{:,.2f}",
+        "Total_Fail_Cost": "€{:,.2f}",
+        "Payback_Runtime": "{:,.1f} Min"
+    }), hide_index=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import streamlit as st
+from utils import (
+    adjust_process,
+    analyze_line,
+    cached_figure,
+    plot_cost_profit_curves,
+    shared_result
+)
+from model import CURVE_MAX_POINTS, cost_profit_curves
+from shift import SHIFT_KPIS, downsample_columns, sample_curves, simulate_shift
+import pandas as pd
+import plotly.graph_objects as go
+
+HEATMAP_COLUMNS = 300
+KPI_LABELS = {
+    "Final_Good_Units": "Gute Einheiten",
+    "Total_Capital_Cost": "Anschaffungskosten (€)",
+    "Total_Overhead_Cost": "Gemeinkosten (€)",
+    "Total_Fail_Cost": "Fehlerkosten (€)",
+    "Total_Material_Cost": "Materialkosten (€)",
+    "Total_Revenue": "Umsatz (€)",
+    "Profit": "Gewinn (€)"
+}
+
+
+def plot_shift_curves(shift, results):
+    fig = plot_cost_profit_curves(sample_curves(shift["curves"], CURVE_MAX_POINTS), title='Simulierter Schichtverlauf')
+    static = cost_profit_curves(results, CURVE_MAX_POINTS)
+    fig.add_trace(go.Scatter(
+        x=static["time"], y=static["profit"], name='Gewinn (statisches Modell)',
+        mode='lines', line=dict(color='gray', dash='dot')
+    ))
+    return fig
+
+
+def plot_heatmap(values, names, title, colorbar_title, colorscale):
+    # Time is averaged into buckets so the payload does not grow with the runtime
+    values, minutes = downsample_columns(values, HEATMAP_COLUMNS)
+    fig = go.Figure(go.Heatmap(
+        z=values, x=minutes, y=names, colorscale=colorscale,
+        colorbar=dict(title=colorbar_title)
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title='Zeit (Min)',
+        yaxis=dict(autorange='reversed'),
+        template='plotly_white'
+    )
+    return fig
+
+
+def main():
+    st.title("Schichtsimulation")
+
+    steps, runtime, sale_price, material_cost = adjust_process()
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+    results = entry["results"]
+
+    col1, col2, col3 = st.columns(3)
+    buffer_size = col1.number_input("Puffergröße zwischen Schritten", min_value=0, max_value=1000, value=5, step=1)
+    ramp_minutes = col2.number_input("Anlaufphase (Min)", min_value=0, max_value=10000, value=60, step=10)
+    ramp_start = col3.slider("Leistung zu Schichtbeginn", min_value=0.1, max_value=1.0, value=0.5, step=0.05, format="%.2f")
+
+    col1, col2, col3 = st.columns(3)
+    break_start = col1.number_input("Pause ab Minute", min_value=0, max_value=10000, value=min(240, int(runtime)), step=10)
+    break_duration = col2.number_input("Pausendauer (Min)", min_value=0, max_value=1000, value=30, step=5)
+    break_step = col3.selectbox("Pause für", ["Ganze Linie"] + [step["Schritt"] for step in steps])
+
+    use_failures = st.checkbox("Zufällige Maschinenausfälle", value=True)
+    col1, col2, col3 = st.columns(3)
+    mtbf = col1.number_input("Mittlere Zeit zwischen Ausfällen (Min)", min_value=1.0, value=240.0, step=10.0, disabled=not use_failures)
+    mttr = col2.number_input("Mittlere Reparaturzeit (Min)", min_value=0.0, value=15.0, step=1.0, disabled=not use_failures)
+    seed = col3.number_input("Seed", min_value=0, value=0, step=1, disabled=not use_failures)
+
+    breaks = []
+    if break_duration > 0:
+        breaks.append((break_start, break_duration, None if break_step == "Ganze Linie" else break_step))
+    options = dict(
+        buffer_size=buffer_size,
+        ramp_minutes=ramp_minutes,
+        ramp_start=ramp_start,
+        breaks=breaks,
+        mtbf=mtbf if use_failures else None,
+        mttr=mttr,
+        seed=int(seed)
+    )
+
+    key = f"{entry['key']}:shift:{sorted(options.items())}"
+    shift = shared_result(key, lambda: simulate_shift(steps, runtime, sale_price, material_cost, **options))
+
+    st.markdown("## Ergebnis der Schicht")
+    columns = st.columns(4)
+    for i, name in enumerate(["Final_Good_Units", "Total_Overhead_Cost", "Total_Revenue", "Profit"]):
+        delta = shift[name] - results[name]
+        value = f"{shift[name]:,.1f}" if name == "Final_Good_Units" else f"€{shift[name]:,.2f}"
+        columns[i].metric(KPI_LABELS[name], value, delta=f"{delta:+,.1f} ggü. statisch")
+
+    st.plotly_chart(
+        cached_figure(entry, f"shift_curves:{key}", plot_shift_curves, shift, results),
+        use_container_width=True
+    )
+    st.plotly_chart(
+        cached_figure(
+            entry, f"shift_util:{key}", plot_heatmap, shift["utilization"], shift["Schritt"],
+            "Auslastung pro Schritt", "Auslastung", "Viridis"
+        ),
+        use_container_width=True
+    )
+    st.plotly_chart(
+        cached_figure(
+            entry, f"shift_buffers:{key}", plot_heatmap, shift["buffers"], shift["Schritt"],
+            "Pufferbestand vor jedem Schritt", "Einheiten", "Blues"
+        ),
+        use_container_width=True
+    )
+
+    comparison = pd.DataFrame({
+        "Kennzahl": [KPI_LABELS[name] for name in SHIFT_KPIS],
+        "Statisches Modell": [results[name] for name in SHIFT_KPIS],
+        "Schichtsimulation": [shift[name] for name in SHIFT_KPIS]
+    })
+    st.dataframe(comparison.style.format({"Statisches Modell": "{:,.2f}", "Schichtsimulation": "{:,.2f}"}), hide_index=True)
+
+
+if __name__ == "__main__":
+    main()
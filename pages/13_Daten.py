@@ -0,0 +1,144 @@
+import os
+import streamlit as st
+from utils import adjust_process, analyze_line, load_steps, shared_result
+from exchange import (
+    DATA_DIR,
+    FORMATS,
+    export_bundle,
+    export_tables,
+    filter_table,
+    numeric_columns,
+    open_table,
+    read_steps,
+    resolve_data_path,
+    scenario_ids,
+    steps_table,
+    table_bytes
+)
+
+FORMAT_LABELS = {"arrow": "Arrow (IPC)", "parquet": "Parquet"}
+UPLOAD_TYPES = ["arrow", "feather", "ipc", "parquet", "pq", "csv"]
+MAX_ROWS = 10_000
+
+
+def open_cached(slot, source, name, version):
+    # The opened table is kept per file, so reruns (e.g. changing a filter) reuse it
+    if st.session_state.get(f"{slot}_source") != version:
+        st.session_state[slot] = open_table(source, name)
+        st.session_state[f"{slot}_source"] = version
+    return st.session_state[slot]
+
+
+def apply_import(steps, scalars):
+    # Button callback, runs before the sidebar is drawn
+    load_steps(steps)
+    if "runtime" in scalars:
+        st.session_state.sidebar_runtime = int(scalars["runtime"])
+    if "sale_price" in scalars:
+        st.session_state.sidebar_sale_price = float(scalars["sale_price"])
+    if "material_cost" in scalars:
+        st.session_state.sidebar_mat_cost = float(scalars["material_cost"])
+
+
+def export_section(entry, steps, runtime, sale_price, material_cost):
+    st.markdown("## Export")
+    fmt = st.radio("Format", list(FORMATS), format_func=FORMAT_LABELS.get, horizontal=True)
+    # Built once per input and format
+    bundle = shared_result(
+        f"{entry['key']}:export:{fmt}",
+        lambda: export_bundle(export_tables(steps, entry["results"], runtime, sale_price, material_cost), fmt)
+    )
+    col1, col2 = st.columns(2)
+    col1.download_button(
+        "Schritte, Ergebnisse und Kurven (ZIP)",
+        bundle,
+        file_name="produktionslinie.zip",
+        mime="application/zip"
+    )
+    col2.download_button(
+        "Nur Schritte",
+        table_bytes(steps_table(steps, runtime, sale_price, material_cost), fmt),
+        file_name=f"schritte{FORMATS[fmt]}",
+        mime="application/octet-stream"
+    )
+
+
+def import_section():
+    st.markdown("## Schritte importieren")
+    uploaded = st.file_uploader("Schritttabelle (Arrow, Parquet oder CSV)", type=UPLOAD_TYPES, key="steps_upload")
+    if uploaded is None:
+        st.caption("Eine Zeile pro Schritt mit den Spalten der Seitenleiste; zusätzliche Spalten wie 'Bereich' bleiben erhalten.")
+        return
+    try:
+        table = open_cached("steps_table", uploaded.getvalue(), uploaded.name, uploaded.file_id)
+        ids = scenario_ids(table)
+        scenario = st.selectbox("Szenario", ids) if ids else None
+        imported, scalars = read_steps(table, scenario=scenario)
+    except ValueError as error:
+        st.error(f"Import nicht möglich: {error}")
+        return
+    st.dataframe(imported, hide_index=True)
+    st.button(
+        f"{len(imported)} Schritte übernehmen",
+        on_click=apply_import,
+        args=(imported, scalars)
+    )
+
+
+def sweep_section():
+    st.markdown("## Große Ergebnisdateien")
+    st.caption(
+        "Ergebnisse von Batch-Läufen, z. B. `python cli.py varianten.jsonl -o ergebnis.arrow`. "
+        "Arrow-Dateien im Datenverzeichnis des Servers (UWM_DATA_DIR) werden eingeblendet statt eingelesen."
+    )
+    uploaded = st.file_uploader("Ergebnisdatei", type=UPLOAD_TYPES, key="sweep_upload")
+    # Server files only from the configured data directory
+    name = st.text_input("oder Datei im Datenverzeichnis des Servers").strip() if DATA_DIR else ""
+    try:
+        if uploaded is not None:
+            table = open_cached("sweep_table", uploaded.getvalue(), uploaded.name, uploaded.file_id)
+        elif name:
+            path = resolve_data_path(name)
+            table = open_cached("sweep_table", path, None, (path, os.path.getmtime(path)))
+        else:
+            return
+    except ValueError as error:
+        st.error(f"Datei kann nicht geöffnet werden: {error}")
+        return
+
+    columns = numeric_columns(table)
+    st.write(f"**{table.num_rows:,} Zeilen**, {table.num_columns} Spalten")
+    if not columns:
+        st.dataframe(table.slice(0, MAX_ROWS).to_pandas())
+        return
+
+    col1, col2, col3 = st.columns(3)
+    column = col1.selectbox("Filterspalte", columns)
+    minimum = col2.number_input("Minimum", value=None, format="%.2f")
+    maximum = col3.number_input("Maximum", value=None, format="%.2f")
+    col4, col5, col6 = st.columns(3)
+    sort_by = col4.selectbox("Sortieren nach", columns, index=columns.index("Profit") if "Profit" in columns else 0)
+    descending = col5.checkbox("Absteigend", value=True)
+    limit = col6.number_input("Max. Zeilen", min_value=1, max_value=MAX_ROWS, value=1000, step=100)
+
+    selected = filter_table(table, column, minimum, maximum, sort_by, descending, int(limit))
+    st.dataframe(selected.to_pandas(), hide_index=True)
+
+
+def main():
+    st.title("Datenaustausch")
+
+    steps, runtime, sale_price, material_cost = adjust_process()
+    entry = analyze_line(steps, runtime, sale_price, material_cost)
+
+    try:
+        export_section(entry, steps, runtime, sale_price, material_cost)
+    except RuntimeError as error:
+        st.error(str(error))
+        return
+    import_section()
+    sweep_section()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import bisect
+
+import numpy as np
+
+from model import STEP_FIELDS, calculate_line_performance_batch, steps_to_arrays
+
+# Pareto front over machine configurations around the current line.
+#
+# Every step may use 1..max_machines machines. If the whole grid is small enough it is
+# enumerated (mixed radix over the steps), otherwise max_candidates vectors are drawn at
+# random; the current configuration is always included. Candidates are evaluated in chunks
+# with the batched model and only the three objectives are kept.
+#
+# non_dominated_mask (all objectives minimized) first picks pivots that minimize random
+# positive weightings of the normalized objectives; such points are always Pareto-optimal
+# and usually dominate most of the cloud, which is removed with a vectorized comparison.
+# The survivors are sorted by the first objective, deduplicated and swept with a staircase
+# over the other two (bisect), O(n log n). Only the frontier goes to the browser.
+
+OBJECTIVES = ["Profit", "Total_Capital_Cost", "Total_Fail_Cost"]
+_SENSE = np.array([-1.0, 1.0, 1.0])  # Profit is maximized
+_EVAL_CHUNK = 1 << 16
+_PIVOTS = 64
+
+
+def candidate_count(n_steps, max_machines):
+    return max_machines ** n_steps
+
+
+def _candidate_chunks(current, max_machines, max_candidates, seed):
+    n_steps = len(current)
+    total = candidate_count(n_steps, max_machines)
+    if total <= max_candidates:
+        radix = max_machines ** np.arange(n_steps - 1, -1, -1)
+        for start in range(0, total, _EVAL_CHUNK):
+            codes = np.arange(start, min(start + _EVAL_CHUNK, total))
+            yield (codes[:, None] // radix % max_machines + 1).astype(np.int16)
+        return
+    rng = np.random.default_rng(seed)
+    yield np.asarray(current, dtype=np.int16)[None, :]
+    remaining = max_candidates - 1
+    while remaining > 0:
+        size = min(_EVAL_CHUNK, remaining)
+        yield rng.integers(1, max_machines + 1, size=(size, n_steps), dtype=np.int16)
+        remaining -= size
+
+
+def sweep_machines(steps, runtime, sale_price, material_cost, max_machines=10,
+                   max_candidates=1_000_000, seed=0):
+    arrays = steps_to_arrays(steps)
+    current = np.clip(arrays["Maschinen"], 1, max_machines)
+    machines, objectives = [], []
+    for chunk in _candidate_chunks(current, max_machines, max_candidates, seed):
+        per_step = {field: np.broadcast_to(arrays[field], chunk.shape) for field in STEP_FIELDS}
+        per_step["Maschinen"] = chunk
+        kpis = calculate_line_performance_batch(
+            *[per_step[field] for field in STEP_FIELDS], runtime, sale_price, material_cost
+        )
+        machines.append(chunk)
+        objectives.append(np.column_stack([kpis[name] for name in OBJECTIVES]))
+    return np.concatenate(machines), np.concatenate(objectives)
+
+
+def _dominated_by(points, pivots, chunk=1 << 15):
+    # True where some pivot is <= in every objective and < in at least one
+    dominated = np.zeros(len(points), dtype=bool)
+    for start in range(0, len(points), chunk):
+        block = points[start:start + chunk, None, :]
+        less_equal = (pivots[None, :, :] <= block).all(axis=2)
+        less = (pivots[None, :, :] < block).any(axis=2)
+        dominated[start:start + chunk] = (less_equal & less).any(axis=1)
+    return dominated
+
+
+def non_dominated_mask(points, seed=0):
+    # points: (n, 2) or (n, 3), all objectives minimized. Duplicates of a frontier point
+    # are all kept.
+    points = np.asarray(points, dtype=float)
+    n, m = points.shape
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    if m not in (2, 3):
+        raise ValueError("Nur zwei oder drei Zielgrößen werden unterstützt")
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    scaled = (points - lo) / np.where(hi > lo, hi - lo, 1.0)
+    weights = np.random.default_rng(seed).dirichlet(np.ones(m), size=_PIVOTS) + 1e-6
+    pivots = points[np.unique(np.argmin(weights @ scaled.T, axis=1))]
+    alive = np.flatnonzero(~_dominated_by(points, pivots))
+
+    # Sort the survivors by the first objective and collapse duplicates into groups
+    order = alive[np.lexsort(points[alive].T[::-1])]
+    candidates = points[order]
+    first = np.ones(len(candidates), dtype=bool)
+    first[1:] = (candidates[1:] != candidates[:-1]).any(axis=1)
+    group = np.cumsum(first) - 1
+    candidates = candidates[first]
+    if m == 2:
+        # A row is dominated iff an earlier row has a smaller or equal second objective
+        previous_min = np.minimum.accumulate(np.concatenate([[np.inf], candidates[:-1, 1]]))
+        keep = candidates[:, 1] < previous_min
+    else:
+        # Staircase over (second, third): second ascending, third strictly descending
+        keep = np.zeros(len(candidates), dtype=bool)
+        stair_y, stair_z = [], []
+        for k, (_, y, z) in enumerate(candidates.tolist()):
+            pos = bisect.bisect_right(stair_y, y)
+            if pos and stair_z[pos - 1] <= z:
+                continue
+            keep[k] = True
+            start = bisect.bisect_left(stair_y, y)
+            end = pos
+            while end < len(stair_y) and stair_z[end] >= z:
+                end += 1
+            stair_y[start:end] = [y]
+            stair_z[start:end] = [z]
+
+    mask = np.zeros(n, dtype=bool)
+    mask[order[keep[group]]] = True
+    return mask
+
+
+def pareto_front(steps, runtime, sale_price, material_cost, max_machines=10,
+                 max_candidates=1_000_000, seed=0):
+    machines, objectives = sweep_machines(
+        steps, runtime, sale_price, material_cost, max_machines, max_candidates, seed
+    )
+    mask = non_dominated_mask(objectives * _SENSE, seed)
+    front = objectives[mask]
+    order = np.argsort(front[:, 1], kind="stable")
+    return {
+        "machines": machines[mask][order].astype(int),
+        "kpis": {name: front[order, j] for j, name in enumerate(OBJECTIVES)},
+        "n_candidates": len(machines),
+        "exhaustive": candidate_count(len(steps), max_machines) <= max_candidates
+    }
@@ -0,0 +1,236 @@
+import heapq
+import math
+
+import numpy as np
+import pandas as pd
+
+from model import DEFAULT_STEPS, KPI_NAMES, STEP_FIELDS, calculate_line_performance_batch
+
+# Plant model: many serial lines that share machine pools and a material supply.
+#
+# A step can draw its machines from a shared pool by naming it under "Ressource". If the
+# lines ask for more machines than a pool has, every step in that pool gets the same share
+# (capacity / demand) of its machines, which caps the units its line can start. The
+# optional material supply caps the units started across all lines per runtime; if the
+# lines together would start more (after the pool caps), every line is throttled by the
+# same factor. Both caps go into the batch evaluation as max_units. All lines
+# are padded to a common step count and evaluated in one batched call. Padding steps have
+# no cycle time, cost or defects, so they change nothing.
+#
+# A plant file is JSON:
+#   {"lines": [{"name": ..., "steps": [...], "runtime": ..., "sale_price": ..., "material_cost": ...}],
+#    "resources": {"Montagezellen": 20, ...}, "material_supply": 5000}
+
+RESOURCE_KEY = "Ressource"
+MATERIAL_RESOURCE = "Material"
+ROLLUP_KPIS = ["T_ideal", "Final_Good_Units", "Total_Capital_Cost", "Total_Overhead_Cost",
+               "Total_Fail_Cost", "Total_Material_Cost", "Total_Revenue", "Profit"]
+
+_PADDING = {
+    "Zykluszeit (Minuten)": 0.0,
+    "Maschinen": 1.0,
+    "Anschaffungskosten (€)": 0.0,
+    "Stillstandskostenrate (€/Min)": 0.0,
+    "Fehlerquote (%)": 0.0,
+    "Kosten pro fehlerhafte Einheit (€)": 0.0
+}
+
+
+class ResourceIndex:
+    # Demand per shared resource plus a lazy max-heap on utilization. Changing one line
+    # only touches the resources it uses; stale heap entries are skipped on lookup.
+    def __init__(self, capacities):
+        self.capacities = dict(capacities)
+        self.demand = {name: 0.0 for name in self.capacities}
+        self._contributions = {}
+        self._versions = {name: 0 for name in self.capacities}
+        self._heap = []
+
+    def utilization(self, resource):
+        capacity = self.capacities[resource]
+        demand = self.demand[resource]
+        if capacity > 0:
+            return demand / capacity
+        return math.inf if demand > 0 else 0.0
+
+    def _push(self, resource):
+        self._versions[resource] += 1
+        heapq.heappush(self._heap, (-self.utilization(resource), self._versions[resource], resource))
+
+    def set_line(self, line_id, contributions):
+        old = self._contributions.get(line_id, {})
+        for resource in set(old) | set(contributions):
+            if resource not in self.capacities:
+                raise ValueError(f"Unbekannte Ressource: {resource}")
+            self.demand[resource] += contributions.get(resource, 0.0) - old.get(resource, 0.0)
+            self._push(resource)
+        self._contributions[line_id] = dict(contributions)
+
+    def bottleneck(self):
+        while self._heap:
+            negative_util, version, resource = self._heap[0]
+            if version == self._versions[resource]:
+                return resource, -negative_util
+            heapq.heappop(self._heap)
+        return None, 0.0
+
+
+class Plant:
+    def __init__(self, lines, resources=None, material_supply=None):
+        self.lines = [dict(line) for line in lines]
+        self.material_supply = material_supply
+        capacities = {name: float(capacity) for name, capacity in (resources or {}).items()}
+        if material_supply is not None:
+            capacities[MATERIAL_RESOURCE] = float(material_supply)
+        self.index = ResourceIndex(capacities)
+        self._pack()
+        self._kpis = self._evaluate(np.arange(len(self.lines)))
+        for i in range(len(self.lines)):
+            self.index.set_line(i, self._contributions(i))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["lines"], data.get("resources"), data.get("material_supply"))
+
+    def _pack(self):
+        n_lines = len(self.lines)
+        width = max((len(line["steps"]) for line in self.lines), default=1)
+        self._arrays = {field: np.full((n_lines, width), _PADDING[field]) for field in STEP_FIELDS}
+        self._scalars = {key: np.zeros(n_lines) for key in ("runtime", "sale_price", "material_cost")}
+        for i in range(n_lines):
+            self._write_line(i)
+
+    def _write_line(self, i):
+        line = self.lines[i]
+        n_steps = len(line["steps"])
+        for field in STEP_FIELDS:
+            row = self._arrays[field][i]
+            row[:] = _PADDING[field]
+            row[:n_steps] = [float(step[field]) for step in line["steps"]]
+        self._scalars["runtime"][i] = float(line.get("runtime", 480))
+        self._scalars["sale_price"][i] = float(line.get("sale_price", 300.0))
+        self._scalars["material_cost"][i] = float(line.get("material_cost", 25.0))
+
+    def _evaluate(self, rows, max_units=None):
+        with np.errstate(divide="ignore"):
+            return calculate_line_performance_batch(
+                *[self._arrays[field][rows] for field in STEP_FIELDS],
+                self._scalars["runtime"][rows],
+                self._scalars["sale_price"][rows],
+                self._scalars["material_cost"][rows],
+                max_units=max_units
+            )
+
+    def _contributions(self, i):
+        contributions = {}
+        for step in self.lines[i]["steps"]:
+            resource = step.get(RESOURCE_KEY)
+            if resource:
+                contributions[resource] = contributions.get(resource, 0.0) + float(step["Maschinen"])
+        if self.material_supply is not None:
+            contributions[MATERIAL_RESOURCE] = float(self._kpis["T_ideal"][i])
+        return contributions
+
+    def update_line(self, i, steps=None, **scalars):
+        # Re-evaluates line i only and updates the resource index for the resources it touches
+        if steps is not None:
+            self.lines[i]["steps"] = steps
+        self.lines[i].update(scalars)
+        if len(self.lines[i]["steps"]) > self._arrays["Maschinen"].shape[1]:
+            self._pack()
+        else:
+            self._write_line(i)
+        row = self._evaluate(np.array([i]))
+        for name in self._kpis:
+            self._kpis[name][i] = row[name][0]
+        self.index.set_line(i, self._contributions(i))
+
+    def material_factor(self, starts=None):
+        # Share of the wanted starts the supply covers; starts defaults to the unthrottled lines
+        if self.material_supply is None:
+            return 1.0
+        demand = self.index.demand[MATERIAL_RESOURCE] if starts is None else float(np.sum(starts))
+        return min(1.0, self.material_supply / demand) if demand > 0 else 1.0
+
+    def pool_factors(self):
+        # Share of its requested machines every step of an overloaded pool gets
+        return {
+            name: min(1.0, self.index.capacities[name] / demand) if demand > 0 else 1.0
+            for name, demand in self.index.demand.items()
+            if name != MATERIAL_RESOURCE
+        }
+
+    def pool_starts(self, factors):
+        # Units each line can start with its pooled steps scaled down to their share
+        machines = self._arrays["Maschinen"].copy()
+        for i, line in enumerate(self.lines):
+            for k, step in enumerate(line["steps"]):
+                factor = factors.get(step.get(RESOURCE_KEY), 1.0)
+                if factor < 1.0:
+                    machines[i, k] *= factor
+        with np.errstate(divide="ignore", invalid="ignore"):
+            eff_cycle = np.nan_to_num(self._arrays["Zykluszeit (Minuten)"] / machines)
+        return self._scalars["runtime"] / eff_cycle.max(axis=1)
+
+    def bottleneck(self):
+        return self.index.bottleneck()
+
+    def results(self):
+        kpis = self._kpis
+        factors = self.pool_factors()
+        starts = kpis["T_ideal"]
+        if any(factor < 1.0 for factor in factors.values()):
+            starts = np.minimum(starts, self.pool_starts(factors))
+        # Material is short: every line starts the same share of what it can start
+        factor = self.material_factor(starts)
+        starts = starts * factor
+        throttled = starts < kpis["T_ideal"] * (1 - 1e-12)
+        if throttled.any():
+            kpis = self._evaluate(np.arange(len(self.lines)), max_units=starts)
+
+        eff_cycle = self._arrays["Zykluszeit (Minuten)"] / self._arrays["Maschinen"]
+        bottleneck_step = eff_cycle.argmax(axis=1)
+        lines = pd.DataFrame({
+            "Linie": [line.get("name", str(i)) for i, line in enumerate(self.lines)],
+            "Schritte": [len(line["steps"]) for line in self.lines],
+            "Engpass": [
+                line["steps"][k]["Schritt"] if line["steps"] else ""
+                for line, k in zip(self.lines, bottleneck_step)
+            ],
+            "Drosselung": kpis["T_ideal"] / np.where(self._kpis["T_ideal"] > 0, self._kpis["T_ideal"], 1.0),
+            **{name: kpis[name] for name in KPI_NAMES}
+        })
+        resources = pd.DataFrame({
+            "Ressource": list(self.index.capacities),
+            "Kapazität": list(self.index.capacities.values()),
+            "Bedarf": [self.index.demand[name] for name in self.index.capacities],
+            "Auslastung": [self.index.utilization(name) for name in self.index.capacities],
+            "Zuteilung": [factors.get(name, factor) for name in self.index.capacities]
+        })
+        return {
+            "lines": lines,
+            "totals": {name: float(np.sum(kpis[name])) for name in ROLLUP_KPIS},
+            "resources": resources,
+            "bottleneck": self.bottleneck(),
+            "material_factor": factor,
+            "pool_factors": factors
+        }
+
+
+def example_plant(n_lines=12, seed=0):
+    # Variants of the default line; assembly, painting and inspection use shared pools
+    rng = np.random.default_rng(seed)
+    pools = {"Montage": "Montagezellen", "Bemalen": "Lackieranlagen", "Qualitätsprüfung": "Prüfstände"}
+    lines = []
+    for i in range(n_lines):
+        steps = []
+        for base in DEFAULT_STEPS:
+            step = dict(base)
+            step["Zykluszeit (Minuten)"] = float(np.round(base["Zykluszeit (Minuten)"] * rng.uniform(0.7, 1.3), 1))
+            step["Maschinen"] = int(rng.integers(1, 4))
+            if base["Schritt"] in pools:
+                step[RESOURCE_KEY] = pools[base["Schritt"]]
+            steps.append(step)
+        lines.append({"name": f"Linie {i + 1}", "steps": steps, "runtime": 480, "sale_price": 300.0, "material_cost": 25.0})
+    resources = {"Montagezellen": 2 * n_lines, "Lackieranlagen": 2 * n_lines, "Prüfstände": 2 * n_lines}
+    return Plant(lines, resources, material_supply=70 * n_lines)
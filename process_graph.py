@@ -0,0 +1,290 @@
+import numpy as np
+import pandas as pd
+
+# Non-serial process graphs: parallel branches, merges and rework loops.
+#
+# The graph is built from the usual step list with three optional keys per step:
+#   "Nachfolger"      successors of the good units, e.g. "Montage" or "Lackieren A:0.6; Lackieren B:0.4"
+#                     (shares must not exceed 1 in total, successors without a share split the
+#                     rest evenly, a total below 1 sends the rest to finished goods); missing
+#                     means the next step in the list,
+#                     "-" means the step delivers finished goods
+#   "Nacharbeit (%)"  share of the defective units that is reworked instead of scrapped
+#   "Nacharbeit zu"   step that receives the reworked units (default: the step itself)
+# Steps without incoming good flow are sources; every source starts one unit per started
+# product. Merges add up the incoming units.
+#
+# Flows per started unit x solve x = s + W^T x, where W holds (1 - fail) * share for
+# good edges and fail * share for rework edges. The strongly connected components are
+# processed in topological order: acyclic parts are a single forward pass, and each rework
+# cycle is solved as a small linear system (sparse if SciPy is installed and the cycle is
+# large). Throughput is limited by the step with the highest load x * cycle / machines.
+
+SUCCESSOR_KEY = "Nachfolger"
+REWORK_KEY = "Nacharbeit (%)"
+REWORK_TARGET_KEY = "Nacharbeit zu"
+GRAPH_KEYS = [SUCCESSOR_KEY, REWORK_KEY, REWORK_TARGET_KEY]
+END_MARKER = "-"
+_SPARSE_THRESHOLD = 200
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, float) and np.isnan(value)) or str(value).strip() == ""
+
+
+def has_graph(steps):
+    # Whether any step sets successors or rework; without them the list is a plain serial
+    # line and needs no graph (nor unique step names)
+    return any(
+        not _is_blank(step.get(SUCCESSOR_KEY)) or float(step.get(REWORK_KEY) or 0.0) > 0
+        for step in steps
+    )
+
+
+def _parse_successors(text, step_name):
+    targets = []
+    for part in str(text).split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        name, separator, share = part.rpartition(":")
+        if not separator:
+            targets.append((part, None))
+            continue
+        try:
+            share = float(share)
+        except ValueError:
+            raise ValueError(f"Anteil {share.strip()!r} für Nachfolger {name.strip()!r} bei {step_name!r} ist keine Zahl")
+        if not 0.0 <= share <= 1.0:
+            raise ValueError(f"Anteil {share:g} für Nachfolger {name.strip()!r} bei {step_name!r} liegt nicht zwischen 0 und 1")
+        targets.append((name.strip(), share))
+    # Shares above 1 in total would create units; successors without a share split the rest
+    given = sum(share for _, share in targets if share is not None)
+    if given > 1.0 + 1e-9:
+        raise ValueError(f"Anteile der Nachfolger von {step_name!r} ergeben {given:g} (> 1)")
+    open_count = sum(share is None for _, share in targets)
+    if open_count:
+        rest = 1.0 - given
+        if rest <= 1e-9:
+            raise ValueError(f"Für Nachfolger ohne Anteil bei {step_name!r} bleibt kein Anteil übrig")
+        targets = [(name, rest / open_count if share is None else share) for name, share in targets]
+    return targets
+
+
+class ProcessGraph:
+    def __init__(self, steps):
+        self.steps = steps
+        self.names = [step["Schritt"] for step in steps]
+        index = {name: i for i, name in enumerate(self.names)}
+        if len(index) != len(self.names):
+            raise ValueError("Schrittnamen müssen für den Prozessgraphen eindeutig sein")
+        self.good_edges = []
+        self.rework_edges = []
+        for i, step in enumerate(steps):
+            successors = step.get(SUCCESSOR_KEY)
+            if _is_blank(successors):
+                if i + 1 < len(steps):
+                    self.good_edges.append((i, i + 1, 1.0))
+            elif str(successors).strip() != END_MARKER:
+                for name, share in _parse_successors(successors, step["Schritt"]):
+                    if name not in index:
+                        raise ValueError(f"Unbekannter Nachfolger {name!r} bei {step['Schritt']!r}")
+                    self.good_edges.append((i, index[name], share))
+            rework = float(step.get(REWORK_KEY) or 0.0)
+            if rework > 0:
+                target = step.get(REWORK_TARGET_KEY) or step["Schritt"]
+                if target not in index:
+                    raise ValueError(f"Unbekanntes Nacharbeitsziel {target!r} bei {step['Schritt']!r}")
+                self.rework_edges.append((i, index[target], rework / 100.0))
+
+    def is_serial(self):
+        return not self.rework_edges and self.good_edges == [(i, i + 1, 1.0) for i in range(len(self.names) - 1)]
+
+    def sources(self):
+        has_input = np.zeros(len(self.names), dtype=bool)
+        for _, j, _ in self.good_edges:
+            has_input[j] = True
+        return np.flatnonzero(~has_input)
+
+
+def _components(n, successors):
+    # Iterative Tarjan; returns the strongly connected components in topological order
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, child = work.pop()
+            if child == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            recurse = False
+            while child < len(successors[node]):
+                nxt = successors[node][child]
+                child += 1
+                if index[nxt] == -1:
+                    work.append((node, child))
+                    work.append((nxt, 0))
+                    recurse = True
+                    break
+                if on_stack[nxt]:
+                    low[node] = min(low[node], index[nxt])
+            if recurse:
+                continue
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+    components.reverse()
+    return components
+
+
+def _solve_cycle(members, incoming, inflow):
+    k = len(members)
+    position = {node: p for p, node in enumerate(members)}
+    rows, cols, weights = [], [], []
+    for node in members:
+        for pred, weight in incoming[node]:
+            if pred in position:
+                rows.append(position[node])
+                cols.append(position[pred])
+                weights.append(weight)
+    try:
+        if k > _SPARSE_THRESHOLD:
+            try:
+                from scipy.sparse import coo_matrix, identity
+                from scipy.sparse.linalg import spsolve
+            except ImportError:
+                pass
+            else:
+                W = coo_matrix((weights, (rows, cols)), shape=(k, k)).tocsc()
+                solution = spsolve(identity(k, format="csc") - W, inflow)
+                if not np.all(np.isfinite(solution)):
+                    raise np.linalg.LinAlgError
+                return solution
+        A = np.eye(k)
+        np.subtract.at(A, (rows, cols), weights)
+        return np.linalg.solve(A, inflow)
+    except np.linalg.LinAlgError:
+        raise ValueError("Nacharbeitsschleife ohne Abfluss: Einheiten kreisen unendlich")
+
+
+def steady_state_flows(graph, include_defects=True):
+    # Units processed per node for every started unit. Without defects only the branch
+    # shares count (the defect-free volume each step is sized for).
+    n = len(graph.names)
+    fail = np.array([float(step["Fehlerquote (%)"]) / 100.0 for step in graph.steps])
+    if not include_defects:
+        fail = np.zeros(n)
+    incoming = [[] for _ in range(n)]
+    successors = [[] for _ in range(n)]
+    for i, j, share in graph.good_edges:
+        incoming[j].append((i, (1 - fail[i]) * share))
+        successors[i].append(j)
+    if include_defects:
+        for i, j, share in graph.rework_edges:
+            incoming[j].append((i, fail[i] * share))
+            successors[i].append(j)
+
+    flows = np.zeros(n)
+    start = np.zeros(n)
+    start[graph.sources()] = 1.0
+    for members in _components(n, successors):
+        member_set = set(members)
+        inflow = np.array([
+            start[node] + sum(flows[pred] * weight for pred, weight in incoming[node] if pred not in member_set)
+            for node in members
+        ])
+        cyclic = len(members) > 1 or any(pred == members[0] for pred, _ in incoming[members[0]])
+        if cyclic:
+            flows[members] = _solve_cycle(members, incoming, inflow)
+        else:
+            flows[members[0]] = inflow[0]
+    return flows
+
+
+def solve_graph(graph, runtime, sale_price, material_cost, capacity_basis="net"):
+    # capacity_basis="net" loads each step with its real volume (after scrap, with rework);
+    # "gross" sizes every step for its defect-free volume like calculate_line_performance.
+    # For a plain serial line "gross" reproduces the linear model.
+    steps = graph.steps
+    cycle = np.array([float(step["Zykluszeit (Minuten)"]) for step in steps])
+    machines = np.array([float(step["Maschinen"]) for step in steps])
+    capital = np.array([float(step["Anschaffungskosten (€)"]) for step in steps])
+    idle_rate = np.array([float(step["Stillstandskostenrate (€/Min)"]) for step in steps])
+    fail = np.array([float(step["Fehlerquote (%)"]) / 100.0 for step in steps])
+    fail_cost = np.array([float(step["Kosten pro fehlerhafte Einheit (€)"]) for step in steps])
+
+    flows = steady_state_flows(graph)
+    basis = flows if capacity_basis == "net" else steady_state_flows(graph, include_defects=False)
+    load = basis * cycle / machines
+    bottleneck = int(np.argmax(load))
+    starts = runtime / load[bottleneck]
+
+    units = starts * flows
+    defects = units * fail
+    rework_share = np.zeros(len(steps))
+    for i, _, share in graph.rework_edges:
+        rework_share[i] += share
+    good_share = np.zeros(len(steps))
+    for i, _, share in graph.good_edges:
+        good_share[i] += share
+    finished = units * (1 - fail) * np.clip(1 - good_share, 0.0, None)
+
+    idle = runtime - starts * load
+    idle = np.where(idle > 0, idle, 0.0)
+    overhead = idle * idle_rate * machines
+    step_fail_cost = defects * fail_cost
+
+    df = pd.DataFrame({
+        "Schritt": graph.names,
+        "Fluss pro Start": flows,
+        "Einheiten": units,
+        "Fehlerhafte Einheiten": defects,
+        "Nacharbeit": defects * rework_share,
+        "Ausschuss": defects * (1 - rework_share),
+        "Fertigware": finished,
+        "Auslastung": load / load[bottleneck],
+        "Idle_Time (Min)": idle,
+        "Gemeinkosten (€)": overhead,
+        "Fehlerkosten (Schritt)": step_fail_cost
+    })
+
+    n_sources = len(graph.sources())
+    final_good_units = finished.sum()
+    total_capital_cost = (capital * machines).sum()
+    total_overhead_cost = overhead.sum()
+    total_fail_cost = step_fail_cost.sum()
+    total_material_cost = starts * n_sources * material_cost
+    total_revenue = final_good_units * sale_price
+    total_costs = total_capital_cost + total_overhead_cost + total_fail_cost + total_material_cost
+    return {
+        "df": df,
+        "graph": graph,
+        "Bottleneck": graph.names[bottleneck],
+        "Starts": starts,
+        "Final_Good_Units": final_good_units,
+        "Total_Capital_Cost": total_capital_cost,
+        "Total_Overhead_Cost": total_overhead_cost,
+        "Total_Fail_Cost": total_fail_cost,
+        "Total_Material_Cost": total_material_cost,
+        "Total_Revenue": total_revenue,
+        "Profit": total_revenue - total_costs,
+        "Runtime": runtime
+    }
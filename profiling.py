@@ -0,0 +1,144 @@
+import gc
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Per-rerun instrumentation.
+#
+# A RerunProfile collects (phase, seconds, allocations) for one script run. A phase costs
+# a few µs to record, well below 1% of a rerun, so recording is always on. Allocations are
+# the net number of GC-tracked objects (lists, dicts, class instances, ...) created in the
+# process during the phase, taken from the generation-0 counter plus the collections seen
+# by a gc callback. sys.getallocatedblocks would be exact but walks the whole heap (tens of
+# µs per call). With concurrent sessions the count is an estimate.
+#
+# When the next rerun of a session starts, the finished profile goes into the process-wide
+# MetricsStore, which keeps a rolling window per phase across all sessions and computes
+# percentiles on demand. Other process-wide statistics (e.g. the shared result store) can be
+# added as sources and appear under their name in the summary. With UWM_METRICS_FILE set,
+# the store writes its summary as JSON to that file at most every EXPORT_INTERVAL seconds.
+
+WINDOW = 1000
+EXPORT_INTERVAL = 10.0
+RERUN_PHASE = "rerun"
+
+_collections = [0]
+
+
+def _count_collections(phase, info):
+    # Every collection resets the generation-0 counter
+    if phase == "start":
+        _collections[0] += 1
+
+
+gc.callbacks.append(_count_collections)
+
+
+def allocations():
+    return _collections[0] * gc.get_threshold()[0] + gc.get_count()[0]
+
+
+class RerunProfile:
+    __slots__ = ("started", "phases")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        count = allocations()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append((name, end - start, allocations() - count, end))
+
+    def record(self, name, seconds, count=0):
+        # For work timed elsewhere
+        self.phases.append((name, seconds, count, time.perf_counter()))
+
+    def duration(self):
+        # Wall time from the start of the run to the end of its last phase
+        if not self.phases:
+            return 0.0
+        return max(end for *_, end in self.phases) - self.started
+
+    def summary(self):
+        return [
+            {"Phase": name, "Zeit (ms)": seconds * 1e3, "Allokationen": count}
+            for name, seconds, count, _ in self.phases
+        ]
+
+
+class MetricsStore:
+    def __init__(self, window=WINDOW, path=None):
+        self.window = window
+        self.path = path
+        self._samples = {}
+        self._lock = threading.Lock()
+        self._reruns = 0
+        self._last_export = 0.0
+        self._sources = {}
+
+    def add_source(self, name, stats):
+        # stats: callable returning a JSON-serialisable dict
+        self._sources[name] = stats
+
+    def add(self, profile):
+        with self._lock:
+            for name, seconds, count, _ in profile.phases:
+                self._series(name).append((seconds, count))
+            self._series(RERUN_PHASE).append((profile.duration(), 0))
+            self._reruns += 1
+            export = self.path is not None and time.monotonic() - self._last_export >= EXPORT_INTERVAL
+            if export:
+                self._last_export = time.monotonic()
+        if export:
+            self.export(self.path)
+
+    def _series(self, name):
+        if name not in self._samples:
+            self._samples[name] = deque(maxlen=self.window)
+        return self._samples[name]
+
+    def summary(self):
+        with self._lock:
+            samples = {name: np.array(series) for name, series in self._samples.items() if series}
+            reruns = self._reruns
+        phases = {}
+        for name, values in samples.items():
+            p50, p90, p99 = np.percentile(values[:, 0], [50, 90, 99]) * 1e3
+            phases[name] = {
+                "n": len(values),
+                "p50_ms": float(p50),
+                "p90_ms": float(p90),
+                "p99_ms": float(p99),
+                "mean_allocations": float(values[:, 1].mean())
+            }
+        summary = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "reruns": reruns,
+            "window": self.window,
+            "phases": phases
+        }
+        for name, stats in self._sources.items():
+            summary[name] = stats()
+        return summary
+
+    def export(self, path):
+        # Written to a temporary file first so readers never see a partial file
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.summary(), fh, indent=2)
+        os.replace(tmp, path)
+
+
+STORE = MetricsStore(path=os.environ.get("UWM_METRICS_FILE"))
@@ -0,0 +1,111 @@
+from functools import lru_cache
+
+import numpy as np
+
+from model import LineResults
+
+# Node/link structure of the line Sankey.
+#
+# The diagram has one node per group of consecutive steps (one step per group unless steps
+# are grouped), a good flow from each group to the next and a defect flow from each group to
+# its own defect sink. Sinks with a share of the started units below a threshold go into a
+# single "Fehler (sonstige)" node, so long lines with many small defect flows stay readable.
+#
+# The structure (labels, colors, link endpoints and which step feeds which link) only
+# depends on the group labels and on which sinks are merged. It is built once per structure
+# and cached; a change of numbers only recomputes the link values.
+
+AREA_KEY = "Bereich"
+OTHER_DEFECTS = "Fehler (sonstige)"
+LAYOUT_CACHE_SIZE = 64
+
+
+def line_flows(results):
+    # Good and defective units per step; cached session results carry the arrays, plain
+    # results from calculate_line_performance the DataFrame
+    if isinstance(results, LineResults):
+        flows = results.flows()
+        return flows["units_good"], flows["units_failed"]
+    df = results["df"]
+    return df['Einheiten (Gut)'].to_numpy(dtype=float), df['Einheiten (Fehler)'].to_numpy(dtype=float)
+
+
+def step_groups(steps, block_size=None):
+    # Group label per step: the step's area if it has one, otherwise blocks of block_size
+    # consecutive steps (or the step itself)
+    groups = []
+    for index, step in enumerate(steps):
+        area = step.get(AREA_KEY)
+        if area:
+            groups.append(str(area))
+        elif block_size:
+            start = index - index % block_size
+            end = min(start + block_size, len(steps))
+            groups.append(f"Schritte {start + 1}–{end}")
+        else:
+            groups.append(step["Schritt"])
+    return groups
+
+
+def group_index(groups):
+    # Consecutive steps with the same label form one node. Returns the group of every step
+    # and the last step of every group (its good output flows on).
+    labels = np.asarray(groups, dtype=object)
+    starts = np.ones(len(labels), dtype=bool)
+    starts[1:] = labels[1:] != labels[:-1]
+    group_of = np.cumsum(starts) - 1
+    last = np.append(np.flatnonzero(starts)[1:] - 1, len(labels) - 1)
+    return group_of, last
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def sankey_layout(groups, minor):
+    # groups: label per step, minor: per group whether its defect sink is merged
+    group_of, last = group_index(groups)
+    names = [groups[i] for i in last]
+    n_groups = len(names)
+    minor = np.asarray(minor, dtype=bool)
+
+    major = np.flatnonzero(~minor)
+    sink = np.empty(n_groups, dtype=int)
+    sink[major] = n_groups + np.arange(len(major))
+    labels = names + [f"Fehler_{names[g]}" for g in major]
+    if minor.any():
+        sink[minor] = len(labels)
+        labels.append(OTHER_DEFECTS)
+
+    n_good = n_groups - 1
+    source = np.concatenate([np.arange(n_good), np.arange(n_groups)])
+    target = np.concatenate([np.arange(1, n_groups), sink])
+    colors = ["blue"] * n_groups + ["red"] * (len(labels) - n_groups)
+    layout = {
+        "labels": labels,
+        "colors": colors,
+        "source": source,
+        "target": target,
+        "group_of": group_of,
+        "last": last,
+        "n_groups": n_groups
+    }
+    for values in (source, target, group_of, last):
+        values.flags.writeable = False
+    return layout
+
+
+def sankey_links(good, failed, groups, min_defect_share=0.0, input_units=None):
+    # Layout plus link values for the given per-step flows. min_defect_share is relative to
+    # the units started at the first step.
+    good = np.asarray(good, dtype=float)
+    failed = np.asarray(failed, dtype=float)
+    group_of, _ = group_index(groups)
+    group_failed = np.bincount(group_of, weights=failed)
+    started = good[0] + failed[0] if len(good) else 0.0
+    scale = 1.0 if input_units is None or started <= 0 else input_units / started
+    minor = group_failed < min_defect_share * started if min_defect_share > 0 else np.zeros(len(group_failed), dtype=bool)
+    # A single merged sink is no simplification
+    if minor.sum() == 1:
+        minor[:] = False
+
+    layout = sankey_layout(tuple(groups), tuple(minor.tolist()))
+    value = np.concatenate([good[layout["last"][:-1]], group_failed]) * scale
+    return layout, value
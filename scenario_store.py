@@ -0,0 +1,252 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from model import KPI_NAMES, STEP_FIELDS, evaluate_scenarios, steps_fingerprint
+
+# Local scenario store on SQLite.
+#
+# `results` holds one row per distinct input (content hash of steps and scalars) with its
+# KPIs; `scenarios` maps names to those hashes. Saving a scenario whose inputs are already
+# known never recomputes, and many names can share one result row. The KPI columns are
+# indexed, so queries like "top 50 by profit with capital below X" stay fast with tens of
+# thousands of rows. A result row without any scenario left pointing at it is deleted.
+#
+# The database lives in the user's data directory (UWM_SCENARIO_DB overrides the path),
+# not next to the source files.
+
+APP_NAME = "uwm"
+
+
+def _data_dir():
+    if os.name == "nt":
+        base = os.environ.get("APPDATA") or Path.home() / "AppData" / "Roaming"
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(base) / APP_NAME
+
+
+DEFAULT_PATH = Path(os.environ.get("UWM_SCENARIO_DB") or _data_dir() / "scenarios.sqlite")
+
+_KPI_COLUMNS = {name: name.lower() for name in KPI_NAMES}
+_ORDER_COLUMNS = set(_KPI_COLUMNS.values()) | {"name", "created_at"}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    hash TEXT PRIMARY KEY,
+    steps_json TEXT NOT NULL,
+    n_steps INTEGER NOT NULL,
+    runtime REAL NOT NULL,
+    sale_price REAL NOT NULL,
+    material_cost REAL NOT NULL,
+    {", ".join(f"{column} REAL" for column in _KPI_COLUMNS.values())}
+);
+CREATE TABLE IF NOT EXISTS scenarios (
+    name TEXT PRIMARY KEY,
+    hash TEXT NOT NULL REFERENCES results(hash),
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_profit ON results(profit);
+CREATE INDEX IF NOT EXISTS idx_results_capital ON results(total_capital_cost, profit);
+CREATE INDEX IF NOT EXISTS idx_results_fail ON results(total_fail_cost);
+CREATE INDEX IF NOT EXISTS idx_scenarios_hash ON scenarios(hash);
+"""
+
+
+class ScenarioStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by the Streamlit script threads, serialized by a lock
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    def _select_in(self, sql, values):
+        # Rows of "sql ... IN (?, ...)" for any number of values
+        values = list(values)
+        rows = []
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            rows += self._conn.execute(sql.format(",".join("?" * len(chunk))), chunk).fetchall()
+        return rows
+
+    def _missing_hashes(self, hashes):
+        known = {row[0] for row in self._select_in("SELECT hash FROM results WHERE hash IN ({})", hashes)}
+        return [h for h in hashes if h not in known]
+
+    def _delete_orphans(self, hashes):
+        self._conn.executemany(
+            "DELETE FROM results WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM scenarios WHERE hash = ?)",
+            [(h, h) for h in hashes]
+        )
+
+    def save_many(self, scenarios, chunk_size=1024):
+        # scenarios: dicts with name, steps, runtime, sale_price, material_cost and
+        # optionally kpis (already evaluated, e.g. the session's results). Only inputs
+        # without a stored result or given KPIs are evaluated (in batches). Returns the
+        # number of newly computed results.
+        computed = 0
+        now = datetime.now(timezone.utc).isoformat()
+        batch = []
+
+        def flush():
+            nonlocal computed
+            by_hash = {}
+            for scenario in batch:
+                by_hash.setdefault(scenario["hash"], scenario)
+            with self._lock, self._conn:
+                missing = set(self._missing_hashes(list(by_hash)))
+                todo = [by_hash[h] for h in by_hash if h in missing]
+                # Results an overwritten name pointed to before
+                previous = {
+                    row[0] for row in self._select_in(
+                        "SELECT hash FROM scenarios WHERE name IN ({})", {s["name"] for s in batch}
+                    )
+                }
+                given = [(s, s["kpis"]) for s in todo if s.get("kpis") is not None]
+                to_compute = [s for s in todo if s.get("kpis") is None]
+                rows = []
+                for scenario, kpis in given + list(evaluate_scenarios(to_compute, chunk_size=chunk_size)):
+                    rows.append((
+                        scenario["hash"],
+                        json.dumps([dict(step) for step in scenario["steps"]], ensure_ascii=False),
+                        len(scenario["steps"]),
+                        float(scenario["runtime"]),
+                        float(scenario["sale_price"]),
+                        float(scenario["material_cost"]),
+                        *[float(kpis[name]) for name in KPI_NAMES]
+                    ))
+                self._conn.executemany(
+                    f"INSERT INTO results VALUES ({','.join('?' * (6 + len(KPI_NAMES)))})", rows
+                )
+                self._conn.executemany(
+                    "INSERT INTO scenarios (name, hash, created_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET hash = excluded.hash, created_at = excluded.created_at",
+                    [(scenario["name"], scenario["hash"], now) for scenario in batch]
+                )
+                self._delete_orphans(previous - set(by_hash))
+                computed += len(to_compute)
+            batch.clear()
+
+        for scenario in scenarios:
+            scenario = dict(scenario)
+            scenario["hash"] = steps_fingerprint(
+                scenario["steps"], scenario["runtime"], scenario["sale_price"], scenario["material_cost"]
+            )
+            batch.append(scenario)
+            if len(batch) >= chunk_size:
+                flush()
+        if batch:
+            flush()
+        return computed
+
+    def save(self, name, steps, runtime, sale_price, material_cost, kpis=None):
+        return self.save_many([{
+            "name": name,
+            "steps": steps,
+            "runtime": runtime,
+            "sale_price": sale_price,
+            "material_cost": material_cost,
+            "kpis": kpis
+        }])
+
+    def delete(self, name):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scenarios WHERE name = ?", (name,))
+            self._conn.execute("DELETE FROM results WHERE hash NOT IN (SELECT hash FROM scenarios)")
+
+    def load(self, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.steps_json, r.runtime, r.sale_price, r.material_cost "
+                "FROM scenarios s JOIN results r ON r.hash = s.hash WHERE s.name = ?",
+                (name,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return {
+            "name": name,
+            "steps": json.loads(row[0]),
+            "runtime": row[1],
+            "sale_price": row[2],
+            "material_cost": row[3]
+        }
+
+    def names(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT name FROM scenarios ORDER BY name")]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0]
+
+    def query(self, order_by="profit", descending=True, limit=50, max_capital=None, min_profit=None):
+        # Index-backed listing, e.g. query("profit", limit=50, max_capital=5000)
+        if order_by not in _ORDER_COLUMNS:
+            raise ValueError(f"Unbekannte Sortierspalte: {order_by}")
+        where, params = [], []
+        if max_capital is not None:
+            where.append("r.total_capital_cost < ?")
+            params.append(max_capital)
+        if min_profit is not None:
+            where.append("r.profit >= ?")
+            params.append(min_profit)
+        sql = (
+            "SELECT s.name, s.created_at, r.n_steps, r.runtime, r.sale_price, r.material_cost, "
+            + ", ".join(f"r.{column}" for column in _KPI_COLUMNS.values())
+            + " FROM results r JOIN scenarios s ON s.hash = r.hash"
+            + (" WHERE " + " AND ".join(where) if where else "")
+            + f" ORDER BY {order_by} {'DESC' if descending else 'ASC'} LIMIT ?"
+        )
+        params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        columns = ["Szenario", "Gespeichert", "Schritte", "Laufzeit", "Verkaufspreis", "Materialkosten"] + KPI_NAMES
+        return pd.DataFrame(rows, columns=columns)
+
+    def diff(self, names, only_changes=False):
+        # Column-by-column comparison: one row per KPI, scalar and step field (steps are
+        # matched by name), one column per scenario
+        loaded = [self.load(name) for name in names]
+        with self._lock:
+            kpis = {
+                row[0]: row[1:]
+                for row in self._conn.execute(
+                    "SELECT s.name, " + ", ".join(f"r.{column}" for column in _KPI_COLUMNS.values())
+                    + f" FROM scenarios s JOIN results r ON r.hash = s.hash WHERE s.name IN ({','.join('?' * len(names))})",
+                    list(names)
+                )
+            }
+        records = {}
+        for name in KPI_NAMES:
+            records[("Kennzahl", name)] = [kpis[s["name"]][KPI_NAMES.index(name)] for s in loaded]
+        for key, label in (("runtime", "Laufzeit"), ("sale_price", "Verkaufspreis"), ("material_cost", "Materialkosten")):
+            records[("Eingabe", label)] = [s[key] for s in loaded]
+        step_names = []
+        for s in loaded:
+            for step in s["steps"]:
+                if step["Schritt"] not in step_names:
+                    step_names.append(step["Schritt"])
+        by_name = [{step["Schritt"]: step for step in s["steps"]} for s in loaded]
+        for step_name in step_names:
+            for field in STEP_FIELDS:
+                records[(step_name, field)] = [
+                    steps[step_name][field] if step_name in steps else None for steps in by_name
+                ]
+        df = pd.DataFrame.from_dict(records, orient="index", columns=[s["name"] for s in loaded])
+        df.index = pd.MultiIndex.from_tuples(df.index, names=["Bereich", "Feld"])
+        changed = df.nunique(axis=1, dropna=False) > 1
+        df["Abweichung"] = changed
+        if only_changes:
+            df = df[changed]
+        return df
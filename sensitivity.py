@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from model import STEP_FIELDS, calculate_line_performance_batch, steps_to_arrays
+
+# One-at-a-time sensitivity of Profit. Every numeric step field and every sidebar scalar
+# is moved by -pct and +pct while the rest stays at the base value. The
+# 2 * (6 * steps + 3) perturbed lines and the base line go through one batched call.
+
+SCALAR_LABELS = ["Laufzeit (Minuten)", "Verkaufspreis (€)", "Materialkosten pro Einheit (€)"]
+# At 100 % the lower value of cycle times and machine counts would be zero
+MAX_PCT = 99.0
+
+
+def sensitivity_analysis(steps, runtime, sale_price, material_cost, pct=10.0):
+    if not 0 < pct <= MAX_PCT:
+        raise ValueError(f"Variation muss zwischen 0 und {MAX_PCT:g} % liegen")
+    arrays = steps_to_arrays(steps)
+    n_steps = len(steps)
+    n_fields = len(STEP_FIELDS)
+    n_params = n_fields * n_steps + len(SCALAR_LABELS)
+    n_rows = 2 * n_params + 1  # the last row is the unperturbed line
+    factors = np.array([1 - pct / 100.0, 1 + pct / 100.0])
+
+    step_columns = {}
+    for a, field in enumerate(STEP_FIELDS):
+        values = np.tile(arrays[field], (n_rows, 1))
+        rows = 2 * (a * n_steps + np.arange(n_steps))
+        cols = np.arange(n_steps)
+        values[rows, cols] *= factors[0]
+        values[rows + 1, cols] *= factors[1]
+        step_columns[field] = values
+    step_columns["Fehlerquote (%)"] = np.clip(step_columns["Fehlerquote (%)"], 0.0, 100.0)
+
+    scalars = []
+    offset = 2 * n_fields * n_steps
+    for k, base in enumerate([runtime, sale_price, material_cost]):
+        values = np.full(n_rows, float(base))
+        values[offset + 2 * k: offset + 2 * k + 2] *= factors
+        scalars.append(values)
+
+    profit = calculate_line_performance_batch(
+        *[step_columns[field] for field in STEP_FIELDS], *scalars
+    )["Profit"]
+    base_profit = profit[-1]
+
+    names = [step["Schritt"] for step in steps]
+    labels = [f"{name}: {field}" for field in STEP_FIELDS for name in names] + SCALAR_LABELS
+    df = pd.DataFrame({
+        "Parameter": labels,
+        "Gewinn (-)": profit[0:-1:2],
+        "Gewinn (+)": profit[1::2]
+    })
+    df["Spanne"] = (df["Gewinn (+)"] - df["Gewinn (-)"]).abs()
+    df = df.sort_values("Spanne", ascending=False, kind="stable").reset_index(drop=True)
+    return {"df": df, "Profit": base_profit, "pct": pct}
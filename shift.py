@@ -0,0 +1,180 @@
+import numpy as np
+
+from model import STEP_FIELDS, steps_to_arrays
+
+# Time-stepped shift simulation (fluid model, one tick per minute).
+#
+# All steps advance together each tick on NumPy state arrays:
+#   buffer[i]    units waiting in front of step i (step 0 draws on unlimited material)
+#   inflight[i]  units started at step i and not finished yet
+# A step starts min(capacity, waiting units, downstream space) units per tick. Capacity is
+# machines / cycle time scaled by the ramp-up factor and the share of machines that are
+# up, precomputed as a (minutes x steps) matrix. A unit finishes cycle time minutes (at
+# least one tick) after it starts; defects are scrapped there and good units enter the
+# next buffer. A finished unit that does not fit into the next buffer stays on its
+# machine, so step i may hold buffer_size + machines units ahead of step i + 1 before it
+# is blocked. Downtime stops new starts, running units still finish.
+#
+# Downtime comes from breaks (whole line or one step) and random machine failures with
+# exponential times between failures (mtbf) and repair times (mttr) per machine.
+# Costs follow the static model: capital is spent at minute 0, material when a unit starts
+# at the first step, defect costs when a defect is found, standstill costs for every
+# machine minute that is not used (down, starved or blocked) and revenue per finished
+# good unit.
+
+SHIFT_KPIS = ["Final_Good_Units", "Total_Capital_Cost", "Total_Overhead_Cost", "Total_Fail_Cost",
+              "Total_Material_Cost", "Total_Revenue", "Profit"]
+
+
+def ramp_factors(runtime, ramp_minutes=0.0, ramp_start=1.0):
+    # Capacity share per minute: linear from ramp_start to 1 over ramp_minutes
+    t = np.arange(runtime, dtype=float)
+    if ramp_minutes <= 0:
+        return np.ones(runtime)
+    return np.minimum(1.0, ramp_start + (1.0 - ramp_start) * t / ramp_minutes)
+
+
+def machines_down(machines, runtime, names, breaks=(), mtbf=None, mttr=30.0, seed=None):
+    # (minutes x steps) count of machines that are down. breaks: (start, duration, step name
+    # or None for the whole line). Failures are drawn for every machine at once.
+    machines = np.asarray(machines, dtype=int)
+    n_steps = len(machines)
+    diff = np.zeros((runtime + 1, n_steps))
+    index = {name: i for i, name in enumerate(names)}
+    for start, duration, step in breaks:
+        start = int(np.clip(start, 0, runtime))
+        end = int(np.clip(start + duration, start, runtime))
+        columns = slice(None) if step is None else index[step]
+        diff[start, columns] += machines if step is None else machines[index[step]]
+        diff[end, columns] -= machines if step is None else machines[index[step]]
+
+    if mtbf is not None and mtbf > 0:
+        rng = np.random.default_rng(seed)
+        owner = np.repeat(np.arange(n_steps), machines)
+        # Enough cycles per machine to cover the shift with high probability
+        n_cycles = int(np.ceil(runtime / (mtbf + mttr) * 2)) + 8
+        up = rng.exponential(mtbf, size=(len(owner), n_cycles))
+        down = rng.exponential(mttr, size=(len(owner), n_cycles)) if mttr > 0 else np.zeros((len(owner), n_cycles))
+        fail_at = np.cumsum(up + down, axis=1) - down
+        repaired_at = fail_at + down
+        starts = np.floor(fail_at).astype(int)
+        ends = np.minimum(np.ceil(repaired_at).astype(int), runtime)
+        valid = starts < runtime
+        rows = np.broadcast_to(owner[:, None], starts.shape)
+        np.add.at(diff, (starts[valid], rows[valid]), 1.0)
+        np.add.at(diff, (ends[valid], rows[valid]), -1.0)
+
+    down = np.cumsum(diff[:-1], axis=0)
+    return np.minimum(down, machines[None, :])
+
+
+def simulate_shift(steps, runtime, sale_price, material_cost, buffer_size=5, ramp_minutes=0.0,
+                   ramp_start=0.5, breaks=(), mtbf=None, mttr=30.0, seed=None):
+    runtime = int(runtime)
+    names = [step["Schritt"] for step in steps]
+    arrays = steps_to_arrays(steps)
+    cycle, machines, capital, idle_rate, fail_percent, fail_cost = (arrays[field] for field in STEP_FIELDS)
+    n = len(steps)
+    fail_rate = fail_percent / 100.0
+    good_rate = 1.0 - fail_rate
+    rate = machines / cycle
+    delay = np.maximum(np.rint(cycle).astype(int), 1)
+
+    down = machines_down(machines, runtime, names, breaks, mtbf, mttr, seed)
+    up_share = 1.0 - down / machines[None, :]
+    capacity = np.ascontiguousarray(rate[None, :] * up_share * ramp_factors(runtime, ramp_minutes, ramp_start)[:, None])
+
+    # Space a step may fill ahead of the next one (buffer plus its own machines); the last
+    # step delivers into finished goods
+    room = np.full(n, np.inf)
+    room[:-1] = float(buffer_size) + machines[:-1]
+
+    pad = int(delay.max())
+    started = np.zeros((runtime + pad, n))
+    finished = np.zeros((runtime, n))
+    buffer_levels = np.zeros((runtime, n))
+    buffer = np.zeros(n)
+    buffer[0] = np.inf
+    inflight = np.zeros(n)
+    space = np.empty(n)
+    columns = np.arange(n)
+    completion_rows = pad - delay
+
+    for t in range(runtime):
+        done = started[completion_rows + t, columns]
+        inflight -= done
+        buffer[1:] += done[:-1] * good_rate[:-1]
+        finished[t] = done
+
+        np.subtract(room[:-1], buffer[1:], out=space[:-1])
+        space[:-1] -= inflight[:-1]
+        space[-1] = np.inf
+        start = np.minimum(np.minimum(capacity[t], buffer), space)
+        np.maximum(start, 0.0, out=start)
+        started[pad + t] = start
+        buffer -= start
+        inflight += start
+        buffer_levels[t] = buffer
+
+    started = started[pad:]
+    buffer_levels[:, 0] = 0.0
+    utilization = started / rate[None, :]
+
+    # Per-minute cash flows, accumulated into curves
+    material_flow = started[:, 0] * material_cost
+    fail_flow = (finished * fail_rate) @ fail_cost
+    good_units = finished[:, -1] * good_rate[-1]
+    revenue_flow = good_units * sale_price
+    overhead_flow = ((1.0 - utilization) * machines * idle_rate).sum(axis=1)
+
+    zero = np.zeros(1)
+    revenue = np.concatenate([zero, np.cumsum(revenue_flow)])
+    material = np.concatenate([zero, np.cumsum(material_flow)])
+    overhead = np.concatenate([zero, np.cumsum(overhead_flow)])
+    fail = np.concatenate([zero, np.cumsum(fail_flow)])
+    capital_line = np.full(runtime + 1, float((capital * machines).sum()))
+    profit = revenue - (capital_line + material + overhead + fail)
+
+    return {
+        "Schritt": names,
+        "curves": {
+            "time": np.arange(runtime + 1, dtype=float),
+            "revenue": revenue,
+            "material": material,
+            "overhead": overhead,
+            "fail": fail,
+            "capital": capital_line,
+            "profit": profit
+        },
+        "utilization": utilization.T.astype(np.float32),
+        "buffers": buffer_levels.T.astype(np.float32),
+        "down": down.T.astype(np.float32),
+        "Final_Good_Units": float(good_units.sum()),
+        "Total_Capital_Cost": float(capital_line[-1]),
+        "Total_Overhead_Cost": float(overhead[-1]),
+        "Total_Fail_Cost": float(fail[-1]),
+        "Total_Material_Cost": float(material[-1]),
+        "Total_Revenue": float(revenue[-1]),
+        "Profit": float(profit[-1]),
+        "Runtime": runtime
+    }
+
+
+def sample_curves(curves, max_points):
+    # Evenly spaced minutes (plus the last one) for the browser
+    n = len(curves["time"])
+    if n <= max_points:
+        return curves
+    index = np.unique(np.round(np.linspace(0, n - 1, max_points)).astype(int))
+    return {name: values[index] for name, values in curves.items()}
+
+
+def downsample_columns(values, max_columns):
+    # Mean over equal time buckets so heatmaps stay small in the browser
+    n_rows, n_cols = values.shape
+    if n_cols <= max_columns:
+        return values, np.arange(n_cols, dtype=float)
+    edges = np.linspace(0, n_cols, max_columns + 1).astype(int)
+    sums = np.add.reduceat(values, edges[:-1], axis=1)
+    widths = np.diff(edges)
+    return sums / widths, (edges[:-1] + edges[1:]) / 2.0
@@ -0,0 +1,272 @@
+import heapq
+from array import array
+from collections import deque
+
+import numpy as np
+
+# Discrete-event simulation of the serial line. It uses the same step schema as
+# calculate_line_performance. Each step has `Maschinen` parallel machines and a finite
+# buffer in front of it (the first step draws from unlimited material). Machines block
+# after service while the downstream buffer is full. Every finished unit is scrapped
+# with probability `Fehlerquote (%)`.
+
+DISTRIBUTIONS = ["deterministic", "exponential", "gamma", "lognormal"]
+
+_DRAW_BLOCK = 4096
+
+
+class _CycleSampler:
+    # Draws cycle times in blocks per step instead of one generator call per event
+    def __init__(self, rng, mean, distribution, cv):
+        self.rng = rng
+        self.mean = mean
+        self.distribution = distribution
+        self.cv = cv
+        self._block = np.empty(0)
+        self._pos = 0
+
+    def _refill(self):
+        size = _DRAW_BLOCK
+        if self.distribution == "deterministic" or self.cv <= 0:
+            block = np.full(size, self.mean)
+        elif self.distribution == "exponential":
+            block = self.rng.exponential(self.mean, size)
+        elif self.distribution == "gamma":
+            shape = 1.0 / self.cv ** 2
+            block = self.rng.gamma(shape, self.mean / shape, size)
+        elif self.distribution == "lognormal":
+            sigma2 = np.log1p(self.cv ** 2)
+            block = self.rng.lognormal(np.log(self.mean) - sigma2 / 2, np.sqrt(sigma2), size)
+        else:
+            raise ValueError(f"Unbekannte Verteilung: {self.distribution}")
+        self._block = block.tolist()
+        self._pos = 0
+
+    def draw(self):
+        if self._pos >= len(self._block):
+            self._refill()
+        value = self._block[self._pos]
+        self._pos += 1
+        return value
+
+
+class _UniformStream:
+    def __init__(self, rng):
+        self.rng = rng
+        self._block = []
+        self._pos = 0
+
+    def draw(self):
+        if self._pos >= len(self._block):
+            self._block = self.rng.random(_DRAW_BLOCK).tolist()
+            self._pos = 0
+        value = self._block[self._pos]
+        self._pos += 1
+        return value
+
+
+def _buffer_capacities(buffer_size, n_steps):
+    # Capacity of the queue in front of each step; index 0 (raw material) is unlimited
+    if np.ndim(buffer_size) == 0:
+        caps = [int(buffer_size)] * n_steps
+    else:
+        caps = [int(b) for b in buffer_size]
+        if len(caps) == n_steps - 1:
+            caps = [0] + caps
+        if len(caps) != n_steps:
+            raise ValueError("buffer_size braucht einen Wert pro Schritt oder pro Zwischenpuffer")
+    caps[0] = 0
+    return caps
+
+
+def simulate_line(steps, runtime, sale_price, material_cost, buffer_size=5,
+                  distribution="exponential", cv=1.0, seed=None):
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    n = len(steps)
+    runtime = float(runtime)
+    machines = [int(step["Maschinen"]) for step in steps]
+    fail_rates = [float(step["Fehlerquote (%)"]) / 100.0 for step in steps]
+    caps = _buffer_capacities(buffer_size, n)
+    samplers = [
+        _CycleSampler(rng, float(step["Zykluszeit (Minuten)"]), distribution, cv) for step in steps
+    ]
+    defects = _UniformStream(rng)
+
+    # Compact per-unit state: the unit id indexes a start-time array, lead times of good
+    # units go into a second array. Queues and blocked machines only hold unit ids.
+    start_times = array("d")
+    lead_times = array("d")
+    queues = [deque() for _ in range(n)]
+    blocked = [deque() for _ in range(n)]  # (unit, blocked_since) per blocked machine
+    idle = list(machines)
+
+    busy_time = [0.0] * n
+    blocked_time = [0.0] * n
+    processed = [0] * n
+    scrapped = [0] * n
+    good_units = 0
+    wip = 0
+    wip_area = 0.0
+    last_time = 0.0
+    queue_area = [0.0] * n
+    queue_last = [0.0] * n
+
+    events = []
+    seq = 0
+
+    def queue_mark(i, now):
+        queue_area[i] += len(queues[i]) * (now - queue_last[i])
+        queue_last[i] = now
+
+    def can_place(j):
+        return len(queues[j]) < caps[j] + idle[j]
+
+    def settle(work, now):
+        nonlocal seq, wip
+        while work:
+            i = work.pop()
+            # Blocked machines hand their units downstream as soon as there is room
+            if i + 1 < n:
+                while blocked[i] and can_place(i + 1):
+                    unit, since = blocked[i].popleft()
+                    blocked_time[i] += now - since
+                    queue_mark(i + 1, now)
+                    queues[i + 1].append(unit)
+                    idle[i] += 1
+                    work.append(i + 1)
+            # Idle machines pull the next unit
+            while idle[i] > 0:
+                if i == 0:
+                    unit = len(start_times)
+                    start_times.append(now)
+                    wip += 1
+                elif queues[i]:
+                    queue_mark(i, now)
+                    unit = queues[i].popleft()
+                else:
+                    break
+                idle[i] -= 1
+                duration = samplers[i].draw()
+                busy_time[i] += min(duration, runtime - now)
+                seq += 1
+                heapq.heappush(events, (now + duration, seq, i, unit))
+            # A pulled unit or a machine left idle makes room for blocked upstream units
+            if i > 0 and blocked[i - 1] and can_place(i):
+                work.append(i - 1)
+
+    settle([0], 0.0)
+
+    while events and events[0][0] <= runtime:
+        now, _, i, unit = heapq.heappop(events)
+        wip_area += wip * (now - last_time)
+        last_time = now
+        processed[i] += 1
+        if defects.draw() < fail_rates[i]:
+            scrapped[i] += 1
+            wip -= 1
+            idle[i] += 1
+            settle([i], now)
+        elif i == n - 1:
+            good_units += 1
+            lead_times.append(now - start_times[unit])
+            wip -= 1
+            idle[i] += 1
+            settle([i], now)
+        elif can_place(i + 1):
+            queue_mark(i + 1, now)
+            queues[i + 1].append(unit)
+            idle[i] += 1
+            settle([i, i + 1], now)
+        else:
+            blocked[i].append((unit, now))
+
+    wip_area += wip * (runtime - last_time)
+    for i in range(n):
+        queue_mark(i, runtime)
+        for _, since in blocked[i]:
+            blocked_time[i] += runtime - since
+
+    busy = np.array(busy_time)
+    blocked_arr = np.array(blocked_time)
+    capacity = np.array(machines, dtype=float) * runtime
+    starved = np.maximum(capacity - busy - blocked_arr, 0.0)
+    scrapped_arr = np.array(scrapped, dtype=float)
+
+    capital = np.array([float(s["Anschaffungskosten (€)"]) for s in steps]) * np.array(machines)
+    idle_rates = np.array([float(s["Stillstandskostenrate (€/Min)"]) for s in steps])
+    fail_costs = np.array([float(s["Kosten pro fehlerhafte Einheit (€)"]) for s in steps])
+
+    units_started = len(start_times)
+    total_capital_cost = capital.sum()
+    total_overhead_cost = ((starved + blocked_arr) * idle_rates).sum()
+    total_fail_cost = (scrapped_arr * fail_costs).sum()
+    total_material_cost = units_started * material_cost
+    total_revenue = good_units * sale_price
+    profit = total_revenue - (total_capital_cost + total_overhead_cost + total_fail_cost + total_material_cost)
+
+    return {
+        "Final_Good_Units": good_units,
+        "Units_Started": units_started,
+        "WIP_Mean": wip_area / runtime if runtime > 0 else 0.0,
+        "WIP_End": wip,
+        "Lead_Times": np.frombuffer(lead_times, dtype=float) if lead_times else np.empty(0),
+        "Total_Capital_Cost": total_capital_cost,
+        "Total_Overhead_Cost": total_overhead_cost,
+        "Total_Fail_Cost": total_fail_cost,
+        "Total_Material_Cost": total_material_cost,
+        "Total_Revenue": total_revenue,
+        "Profit": profit,
+        "Runtime": runtime,
+        "per_step": {
+            "Schritt": [step["Schritt"] for step in steps],
+            "Bearbeitet": np.array(processed),
+            "Ausschuss": scrapped_arr,
+            "Auslastung": busy / capacity,
+            "Blockiert": blocked_arr / capacity,
+            "Verhungert": starved / capacity,
+            "Puffer_Mittel": np.array(queue_area) / runtime
+        }
+    }
+
+
+SIM_KPIS = [
+    "Final_Good_Units",
+    "Units_Started",
+    "WIP_Mean",
+    "Total_Overhead_Cost",
+    "Total_Fail_Cost",
+    "Total_Material_Cost",
+    "Total_Revenue",
+    "Profit"
+]
+
+
+def run_replications(steps, runtime, sale_price, material_cost, replications=20, seed=None, **sim_options):
+    # Independent replications, each with its own child seed of one SeedSequence
+    children = np.random.SeedSequence(seed).spawn(replications)
+    runs = [
+        simulate_line(steps, runtime, sale_price, material_cost,
+                      seed=np.random.default_rng(child), **sim_options)
+        for child in children
+    ]
+    kpis = {name: np.array([run[name] for run in runs], dtype=float) for name in SIM_KPIS}
+    summary = {}
+    for name, values in kpis.items():
+        std = values.std(ddof=1) if len(values) > 1 else 0.0
+        half_width = 1.96 * std / np.sqrt(len(values))
+        summary[name] = {
+            "mean": values.mean(),
+            "std": std,
+            "ci_low": values.mean() - half_width,
+            "ci_high": values.mean() + half_width
+        }
+    per_step_keys = ["Bearbeitet", "Ausschuss", "Auslastung", "Blockiert", "Verhungert", "Puffer_Mittel"]
+    per_step = {"Schritt": runs[0]["per_step"]["Schritt"]}
+    for key in per_step_keys:
+        per_step[key] = np.mean([run["per_step"][key] for run in runs], axis=0)
+    return {
+        "replications": kpis,
+        "summary": summary,
+        "per_step": per_step,
+        "Lead_Times": np.concatenate([run["Lead_Times"] for run in runs])
+    }
@@ -1,85 +1,171 @@
+import json
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from copy import deepcopy
-
-DEFAULT_STEPS = [
-    {
-        "Schritt": "Materialeingang",
-        "Zykluszeit (Minuten)": 3.0,
-        "Maschinen": 1,
-        "Anschaffungskosten (€)": 50.0,
-        "Stillstandskostenrate (€/Min)": 0.10,
-        "Fehlerquote (%)": 3.0,
-        "Kosten pro fehlerhafte Einheit (€)": 2.0
-    },
-    {
-        "Schritt": "Schneiden",
-        "Zykluszeit (Minuten)": 6.0,
-        "Maschinen": 1,
-        "Anschaffungskosten (€)": 100.0,
-        "Stillstandskostenrate (€/Min)": 1.20,
-        "Fehlerquote (%)": 2.0,
-        "Kosten pro fehlerhafte Einheit (€)": 5.0
-    },
-    {
-        "Schritt": "Montage",
-        "Zykluszeit (Minuten)": 10.0,
-        "Maschinen": 1,
-        "Anschaffungskosten (€)": 200.0,
-        "Stillstandskostenrate (€/Min)": 2,
-        "Fehlerquote (%)": 3.0,
-        "Kosten pro fehlerhafte Einheit (€)": 10.0
-    },
-    {
-        "Schritt": "Bemalen",
-        "Zykluszeit (Minuten)": 4.0,
-        "Maschinen": 1,
-        "Anschaffungskosten (€)": 800.0,
-        "Stillstandskostenrate (€/Min)": 4,
-        "Fehlerquote (%)": 4.5,
-        "Kosten pro fehlerhafte Einheit (€)": 15.0
-    },
-    {
-        "Schritt": "Qualitätsprüfung",
-        "Zykluszeit (Minuten)": 5.0,
-        "Maschinen": 1,
-        "Anschaffungskosten (€)": 120.0,
-        "Stillstandskostenrate (€/Min)": 2.25,
-        "Fehlerquote (%)": 12.0,
-        "Kosten pro fehlerhafte Einheit (€)": 25.0
-    },
-    {
-        "Schritt": "Versand",
-        "Zykluszeit (Minuten)": 3.0,
-        "Maschinen": 1,
-        "Anschaffungskosten (€)": 70.0,
-        "Stillstandskostenrate (€/Min)": 1.5,
-        "Fehlerquote (%)": 0.5,
-        "Kosten pro fehlerhafte Einheit (€)": 2.0
-    }
-]
-
-
-def add_new_step(steps, new_step):
-    steps.append(new_step)
-    return steps
-
-def remove_steps(steps, steps_to_remove):
-    return [step for step in steps if step["Schritt"] not in steps_to_remove]
-
-def move_step(steps, index, direction):
-    if direction == "up" and index > 0:
-        steps[index], steps[index-1] = steps[index-1], steps[index]
-    elif direction == "down" and index < len(steps)-1:
-        steps[index], steps[index+1] = steps[index+1], steps[index]
-    return steps
+from plotly.basedatatypes import BaseFigure
+from incremental import IncrementalLine
+from profiling import STORE, RerunProfile
+from model import (
+    CURVE_MAX_POINTS,
+    DEFAULT_STEP_RECORDS,
+    DEFAULT_STEPS,
+    MAX_MACHINES,
+    STEP_FIELDS,
+    STEP_LIMITS,
+    ResultCache,
+    SharedStore,
+    Step,
+    add_new_step,
+    calculate_line_performance,
+    cost_profit_curves,
+    line_break_even,
+    move_step,
+    remove_steps,
+    steps_fingerprint,
+    steps_to_arrays,
+    to_steps
+)
+
+FIGURE_WORKERS = 2
+# One pool per server process; figure builders only read their inputs
+_FIGURE_POOL = ThreadPoolExecutor(max_workers=FIGURE_WORKERS, thread_name_prefix="figures")
+
+# Results and figures shared by all sessions of this server process, beneath the
+# per-session caches. Bounded to UWM_SHARED_STORE_MB (approximate sizes).
+SHARED_STORE_MB = float(os.environ.get("UWM_SHARED_STORE_MB", "256"))
+SHARED_STORE = SharedStore(
+    maxsize=1024,
+    max_bytes=int(SHARED_STORE_MB * 2**20),
+    sizeof=lambda value: deep_sizeof(value, set())
+)
+STORE.add_source("shared_store", SHARED_STORE.stats)
+
+
+
+def bump_steps_version():
+    # The step grid keeps its edits relative to the rows it was given; a new key starts a
+    # fresh grid whenever the steps change from elsewhere (move, add, remove, load)
+    st.session_state.steps_version = st.session_state.get("steps_version", 0) + 1
+
+
+def load_steps(steps):
+    # Replaces the session steps, e.g. from a button callback
+    st.session_state.steps = to_steps(steps)
+    bump_steps_version()
+
+
+def move_selected_step(direction):
+    # Button callback; the selection follows the moved step
+    index = st.session_state.move_step_index
+    steps = st.session_state.steps
+    st.session_state.steps = move_step(steps, index, direction)
+    st.session_state.move_step_index = max(0, min(len(steps) - 1, index + (-1 if direction == "up" else 1)))
+    bump_steps_version()
+
+
+def steps_table(steps):
+    return pd.DataFrame({"Schritt": [step["Schritt"] for step in steps], **steps_to_arrays(steps)})
+
+
+def step_column_config():
+    config = {}
+    for field, (min_value, max_value, step) in STEP_LIMITS.items():
+        config[field] = st.column_config.NumberColumn(
+            min_value=min_value,
+            max_value=max_value,
+            step=step,
+            format="%d" if field == "Maschinen" else None,
+            required=True
+        )
+    return config
+
+
+def apply_step_table(steps, table):
+    # Writes the edited grid back into the step list; only rows that changed get a new
+    # record. Returns the changed indices.
+    changed = []
+    values = table[STEP_FIELDS].to_numpy(dtype=float)
+    for index, (step, row) in enumerate(zip(steps, values)):
+        edits = {
+            field: int(value) if field == "Maschinen" else float(value)
+            for field, value in zip(STEP_FIELDS, row)
+            if value == value and value != step[field]
+        }
+        if edits:
+            steps[index] = step.replace(edits)
+            changed.append(index)
+    return changed
+
+
+def begin_rerun():
+    # Called once per script run: the profile of the previous run goes into the shared
+    # metrics store and a new one starts
+    previous = st.session_state.get("profile")
+    if previous is not None and previous.phases:
+        STORE.add(previous)
+        st.session_state.last_profile = previous
+    profile = RerunProfile()
+    st.session_state.profile = profile
+    return profile
+
+
+def current_profile():
+    profile = st.session_state.get("profile")
+    if profile is None:
+        profile = begin_rerun()
+    return profile
+
+
+def profiled(name):
+    # Phase context manager on the profile of the current run
+    return current_profile().phase(name)
+
+
+def show_profile_panel():
+    # Opt-in sidebar panel: the previous run of this session and the rolling percentiles
+    # across all sessions of this server process
+    if not st.sidebar.checkbox("Laufzeitprofil anzeigen", key="debug_profile"):
+        return
+    last = st.session_state.get("last_profile")
+    if last is not None:
+        st.sidebar.caption(f"Letzter Lauf: {last.duration() * 1e3:,.1f} ms")
+        st.sidebar.dataframe(last.summary(), hide_index=True)
+    summary = STORE.summary()
+    st.sidebar.caption(f"Alle Sitzungen: {summary['reruns']} Läufe")
+    st.sidebar.dataframe(
+        [{"Phase": name, **values} for name, values in summary["phases"].items()],
+        hide_index=True
+    )
+    st.sidebar.caption(
+        f"Gemeinsamer Ergebnisspeicher: Trefferquote {summary['shared_store']['hit_rate']:.0%}, "
+        f"{summary['shared_store']['bytes'] / 2**20:,.1f} MB"
+    )
+    st.sidebar.dataframe([summary["shared_store"]], hide_index=True)
+    st.sidebar.download_button(
+        "Metriken exportieren",
+        json.dumps(summary, indent=2),
+        file_name="metrics.json",
+        mime="application/json"
+    )
 
 
 def adjust_process():
+    begin_rerun()
+    with profiled("adjust_process"):
+        process = _process_sidebar()
+    show_profile_panel()
+    return process
+
+
+def _process_sidebar():
     #If not in session, load default steps
     if "steps" not in st.session_state:
-        st.session_state.steps = deepcopy(DEFAULT_STEPS)
+        st.session_state.steps = list(DEFAULT_STEP_RECORDS)
 
     steps = st.session_state.steps  # current steps
 
@@ -112,63 +198,30 @@ def adjust_process():
     )
 
     st.sidebar.subheader("Bestehende Schritte bearbeiten")
-    for index, step in enumerate(steps):
-        with st.sidebar.expander(f"{step['Schritt']} bearbeiten"):
-            step['Zykluszeit (Minuten)'] = st.number_input(
-                f"Zykluszeit für {step['Schritt']} (Min)",
-                min_value=0.1,
-                max_value=10000.0,
-                value=float(step['Zykluszeit (Minuten)']),
-                step=0.1,
-                key=f"zykluszeit_{index}"
-            )
-            step['Maschinen'] = st.number_input(
-                f"Anzahl Maschinen für {step['Schritt']}",
-                min_value=1,
-                max_value=10,
-                value=int(step['Maschinen']),
-                step=1,
-                key=f"maschinen_{index}"
-            )
-            step['Anschaffungskosten (€)'] = st.number_input(
-                f"Anschaffungskosten pro Maschine für {step['Schritt']} (€)",
-                min_value=0.0,
-                max_value=100000.0,
-                value=float(step['Anschaffungskosten (€)']),
-                step=100.0,
-                key=f"anschaffung_{index}"
-            )
-            step['Stillstandskostenrate (€/Min)'] = st.number_input(
-                f"Stillstandskostenrate pro Maschine für {step['Schritt']} (€/Min)",
-                min_value=0.0,
-                max_value=10000.0,
-                value=float(step['Stillstandskostenrate (€/Min)']),
-                step=0.1,
-                key=f"idle_cost_{index}"
-            )
-            step['Fehlerquote (%)'] = st.number_input(
-                f"Fehlerquote für {step['Schritt']} (%)",
-                min_value=0.0,
-                max_value=100.0,
-                value=float(step['Fehlerquote (%)']),
-                step=0.1,
-                key=f"fail_rate_{index}"
-            )
-            step['Kosten pro fehlerhafte Einheit (€)'] = st.number_input(
-                f"Kosten pro fehlerhafte Einheit für {step['Schritt']} (€)",
-                min_value=0.0,
-                max_value=10000.0,
-                value=float(step['Kosten pro fehlerhafte Einheit (€)']),
-                step=1.0,
-                key=f"fail_cost_{index}"
-            )
-            col_move1, col_move2 = st.columns(2)
-            with col_move1:
-                if st.button("Nach oben verschieben", key=f"move_up_{index}"):
-                    st.session_state.steps = move_step(st.session_state.steps, index, "up")
-            with col_move2:
-                if st.button("Nach unten verschieben", key=f"move_down_{index}"):
-                    st.session_state.steps = move_step(st.session_state.steps, index, "down")
+    # One grid in a form instead of six inputs per step: the widget count no longer grows
+    # with the line, and all edits arrive together on submit in a single rerun
+    with st.sidebar.form("step_form", border=False):
+        edited = st.data_editor(
+            steps_table(steps),
+            key=f"step_editor_{st.session_state.get('steps_version', 0)}",
+            hide_index=True,
+            disabled=["Schritt"],
+            column_config=step_column_config(),
+            use_container_width=True
+        )
+        submitted = st.form_submit_button("Änderungen übernehmen")
+    if submitted and apply_step_table(steps, edited):
+        bump_steps_version()
+
+    st.sidebar.selectbox(
+        "Schritt verschieben",
+        range(len(steps)),
+        format_func=lambda index: steps[index]["Schritt"],
+        key="move_step_index"
+    )
+    col_move1, col_move2 = st.sidebar.columns(2)
+    col_move1.button("Nach oben verschieben", on_click=move_selected_step, args=("up",))
+    col_move2.button("Nach unten verschieben", on_click=move_selected_step, args=("down",))
 
     st.sidebar.markdown("---")
     st.sidebar.subheader("Neuen Schritt hinzufügen")
@@ -186,7 +239,7 @@ def adjust_process():
             new_stations = st.number_input(
                 f"Anzahl Maschinen für {new_step_name}",
                 min_value=1,
-                max_value=10,
+                max_value=MAX_MACHINES,
                 value=1,
                 step=1,
                 key="new_stations"
@@ -224,7 +277,7 @@ def adjust_process():
                 key="new_fail_cost"
             )
             if st.button("Schritt hinzufügen"):
-                s = {
+                s = Step({
                     "Schritt": new_step_name,
                     "Zykluszeit (Minuten)": new_cycle_time,
                     "Maschinen": new_stations,
@@ -232,8 +285,9 @@ def adjust_process():
                     "Stillstandskostenrate (€/Min)": new_idle_cost,
                     "Fehlerquote (%)": new_fail_rate,
                     "Kosten pro fehlerhafte Einheit (€)": new_fail_cost
-                }
+                })
                 st.session_state.steps = add_new_step(st.session_state.steps, s)
+                bump_steps_version()
                 st.sidebar.success(f"Schritt '{new_step_name}' hinzugefügt!")
                 #st.sidebar.experimental_rerun()
 
@@ -246,6 +300,7 @@ def adjust_process():
     if steps_to_remove:
         if st.sidebar.button("Ausgewählte Schritte entfernen"):
             st.session_state.steps = remove_steps(st.session_state.steps, steps_to_remove)
+            bump_steps_version()
             st.sidebar.success(f"Entfernte Schritte: {', '.join(steps_to_remove)}")
            # st.sidebar.experimental_rerun()
     st.sidebar.markdown("---")
@@ -257,53 +312,174 @@ def adjust_process():
     return st.session_state.steps, runtime, sale_price, material_cost
 
 
-def calculate_line_performance(steps, runtime, sale_price, material_cost):
-    df = pd.DataFrame(steps)
-    df['Effektive Zykluszeit (Minuten)'] = df['Zykluszeit (Minuten)'] / df['Maschinen']
-    df['fail_rate'] = df['Fehlerquote (%)'] / 100.0
-
-    T_ideal = (runtime / df['Effektive Zykluszeit (Minuten)']).min()
-
-    df['Idle_Time (Min)'] = runtime - (T_ideal * df['Effektive Zykluszeit (Minuten)'])
-    df['Idle_Time (Min)'] = df['Idle_Time (Min)'].apply(lambda x: x if x > 0 else 0.0)
-    df['Gemeinkosten (€)'] = df['Idle_Time (Min)'] * df['Stillstandskostenrate (€/Min)'] * df['Maschinen']
-
-    units_in = T_ideal
-    total_fail_cost = 0.0
-    for i, row in df.iterrows():
-        step_fail = units_in * row['fail_rate']
-        step_out = units_in * (1 - row['fail_rate'])
-        step_fail_cost = step_fail * row['Kosten pro fehlerhafte Einheit (€)']
-        total_fail_cost += step_fail_cost
-        units_in = step_out
-
-    final_good_units = units_in
-    total_capital_cost = (df['Anschaffungskosten (€)'] * df['Maschinen']).sum()
-    total_overhead_cost = df['Gemeinkosten (€)'].sum()
-    total_material_cost = T_ideal * material_cost
-    total_revenue = final_good_units * sale_price
-    total_costs = total_capital_cost + total_overhead_cost + total_fail_cost + total_material_cost
-    profit = total_revenue - total_costs
-
-    results = {
-        "df": df,
-        "Final_Good_Units": final_good_units,
-        "T_ideal": T_ideal,
-        "Total_Capital_Cost": total_capital_cost,
-        "Total_Overhead_Cost": total_overhead_cost,
-        "Total_Fail_Cost": total_fail_cost,
-        "Total_Material_Cost": total_material_cost,
-        "Total_Revenue": total_revenue,
-        "Profit": profit,
-        "Runtime": runtime
-    }
-    return results
+def get_result_cache():
+    #One cache per session, shared by all pages
+    if "result_cache" not in st.session_state:
+        st.session_state.result_cache = ResultCache()
+    return st.session_state.result_cache
+
+
+def shared_result(key, compute):
+    # Derived results (simulations, fronts, ...): the session cache first, then the shared
+    # store, so each is computed at most once per server process
+    cache = get_result_cache()
+    value = cache.get(key)
+    if value is None:
+        value = SHARED_STORE.get_or_compute(key, compute)
+        cache.put(key, value)
+    return value
+
+
+def get_incremental_line(steps, runtime, sale_price, material_cost):
+    # The session keeps one IncrementalLine; submitting the step grid only updates the
+    # paths of the rows that changed instead of recomputing the whole line
+    line = st.session_state.get("incremental_line")
+    if line is None:
+        line = IncrementalLine(steps, runtime, sale_price, material_cost)
+        st.session_state.incremental_line = line
+    else:
+        line.sync(steps, runtime, sale_price, material_cost)
+    return line
+
+
+def analyze_line(steps, runtime, sale_price, material_cost, cache=None):
+    # Returns the cache entry {"key", "results"} for these inputs and only runs
+    # calculate_line_performance when no session has seen the fingerprint yet. Entries
+    # are shared between sessions and read-only; their figures are separate store entries
+    # under the same key prefix, so the store's byte bound covers them.
+    if cache is None:
+        cache = get_result_cache()
+    with profiled("analyze_line"):
+        key = steps_fingerprint(steps, runtime, sale_price, material_cost)
+        entry = cache.get(key)
+        if entry is None:
+            # Sessions with the same inputs (e.g. the default line) share one entry
+            entry = SHARED_STORE.get_or_compute(key, lambda: {
+                "key": key,
+                "results": get_incremental_line(steps, runtime, sale_price, material_cost).results()
+            })
+            cache.put(key, entry)
+    return entry
+
+
+def deep_sizeof(obj, seen):
+    # Approximate bytes reachable from obj. Ids in seen are skipped, so shared objects
+    # can be excluded up front and every object is only counted once.
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, BaseFigure):
+        # Count the figure data, not plotly's shared validators
+        return sys.getsizeof(obj) + deep_sizeof(obj.to_plotly_json(), seen)
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is not None else 0)
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    if not isinstance(obj, (str, bytes, int, float, bool, type(None))) and type(obj) not in (dict, list, tuple, set, frozenset):
+        # Also dict subclasses with slots, e.g. LineResults
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def session_footprint():
+    # Bytes held by this session per session-state key. The default step records and the
+    # shared store are shared by all sessions and therefore not counted.
+    seen = set()
+    deep_sizeof(DEFAULT_STEP_RECORDS, seen)
+    deep_sizeof(SHARED_STORE.values(), seen)
+    sizes = {str(key): deep_sizeof(value, seen) for key, value in st.session_state.to_dict().items()}
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
+
+
+def figure_key(entry, name):
+    return f"{entry['key']}:{name}"
+
+
+def shared_figure(entry, name, builder, args):
+    # Builds a figure once per process. It is only kept in the store, so an evicted figure
+    # is built again on its next use.
+    return SHARED_STORE.get_or_compute(figure_key(entry, name), lambda: builder(*args))
+
+
+def cached_figure(entry, name, builder, *args):
+    #Figures are derived from the same inputs as the results entry
+    figure = SHARED_STORE.get(figure_key(entry, name))
+    if figure is None:
+        with profiled(f"figure:{name}"):
+            figure = shared_figure(entry, name, builder, args)
+    return figure
+
+
+def _build_figure(entry, name, builder, args, cancelled, profile):
+    # Runs on a pool thread. Jobs of a superseded input are skipped if they have not
+    # started yet; a finished figure is kept in the store either way.
+    if cancelled.is_set():
+        return None
+    with profile.phase(f"figure:{name}"):
+        return shared_figure(entry, name, builder, args)
+
+
+def submit_figures(entry, jobs):
+    # Starts the figure builders {name: (builder, *args)} in the background and returns
+    # {name: future}. Cached figures come back as finished futures. When the inputs changed
+    # since the last call, the jobs of the old entry are cancelled.
+    state = st.session_state.get("figure_jobs")
+    if state is not None and state["key"] != entry["key"]:
+        state["cancelled"].set()
+        for future in state["futures"].values():
+            future.cancel()
+        state = None
+    if state is None:
+        state = {"key": entry["key"], "cancelled": threading.Event(), "futures": {}}
+        st.session_state.figure_jobs = state
+
+    futures = {}
+    for name, (builder, *args) in jobs.items():
+        figure = SHARED_STORE.get(figure_key(entry, name))
+        if figure is not None:
+            future = Future()
+            future.set_result(figure)
+        else:
+            future = state["futures"].get(name)
+            if future is None or future.cancelled():
+                future = _FIGURE_POOL.submit(
+                    _build_figure, entry, name, builder, args, state["cancelled"], current_profile()
+                )
+                state["futures"][name] = future
+        futures[name] = future
+    return futures
+
+
+def render_figures(placeholders, futures):
+    # Fills each placeholder as soon as its figure is ready, in completion order
+    names = {future: name for name, future in futures.items()}
+    for future in as_completed(names):
+        with profiled(f"plotly_chart:{names[future]}"):
+            placeholders[names[future]].plotly_chart(future.result(), use_container_width=True)
+    # Finished figures are in the shared store; the session does not hold on to them
+    state = st.session_state.get("figure_jobs")
+    if state is not None:
+        state["futures"] = {name: future for name, future in state["futures"].items() if not future.done()}
 
 #Display the top summary
 
 def display_summary(results):
-    df_display = results["df"].copy()
-    df_display = df_display[[
+    with profiled("display_summary"):
+        _display_summary(results)
+
+
+def _display_summary(results):
+    break_even = line_break_even(results)
+    df_display = results["df"][[
         "Schritt",
         "Zykluszeit (Minuten)",
         "Maschinen",
@@ -339,59 +515,118 @@ def display_summary(results):
     col5.metric("Gesamte Materialkosten (€)", f"€{results['Total_Material_Cost']:.2f}")
     col6.metric("Gesamtumsatz (€)", f"€{results['Total_Revenue']:.2f}")
 
-    col7, _ = st.columns(2)
+    col7, col8 = st.columns(2)
     col7.metric("Gewinn (€)", f"€{results['Profit']:.2f}")
+    col8.metric("Mindestverkaufspreis (€)", _format_value(break_even["Min_Sale_Price"], "€{:,.2f}"))
 
+    col9, col10 = st.columns(2)
+    col9.metric(
+        "Gewinnschwelle im Verlauf (Min)",
+        _format_value(break_even["Break_Even_Time"], "{:,.1f}"),
+        help="Minute, ab der der Gewinn über die Laufzeit (Diagramm) nicht mehr negativ ist"
+    )
+    col10.metric(
+        "Amortisationslaufzeit (Min)",
+        _format_value(break_even["Payback_Runtime"], "{:,.1f}"),
+        help="Laufzeit, bei der der Gewinn die Anschaffungskosten gerade deckt"
+    )
+
+
+def _format_value(value, fmt):
+    # NaN: not reached in this run, inf: never
+    if np.isnan(value):
+        return "nicht erreicht"
+    if np.isinf(value):
+        return "nie"
+    return fmt.format(value)
+
+
+def plot_cost_profit_analysis_line(results, max_points=CURVE_MAX_POINTS):
+    return plot_cost_profit_curves(
+        cost_profit_curves(results, max_points),
+        break_even_time=line_break_even(results)["Break_Even_Time"]
+    )
 
-def plot_cost_profit_analysis_line(results):
-    runtime = int(results["Runtime"])
-    df = results["df"]
-    lead_time = df['Effektive Zykluszeit (Minuten)'].sum()
-    time_range = range(runtime + 1)
-
-    total_capital = results["Total_Capital_Cost"]
-    total_overhead = results["Total_Overhead_Cost"]
-    total_fail = results["Total_Fail_Cost"]
-    total_material = results["Total_Material_Cost"]
-    total_revenue = results["Total_Revenue"]
-
-    capital_line = [total_capital]*(runtime+1)
-    overhead_line = []
-    for t in time_range:
-        fraction = t / runtime if runtime>0 else 1
-        overhead_line.append(total_overhead * fraction)
-
-    material_line, fail_line, revenue_line = [], [], []
-    for t in time_range:
-        if t < lead_time or runtime == lead_time:
-            material_line.append(0.0)
-            fail_line.append(0.0)
-            revenue_line.append(0.0)
-        else:
-            fraction = (t - lead_time)/(runtime - lead_time) if (runtime - lead_time)>0 else 1
-            material_line.append(total_material * fraction)
-            fail_line.append(total_fail * fraction)
-            revenue_line.append(total_revenue * fraction)
 
-    profit_line = []
-    for i, _ in enumerate(time_range):
-        current_cost = capital_line[i] + overhead_line[i] + material_line[i] + fail_line[i]
-        current_revenue = revenue_line[i]
-        profit_line.append(current_revenue - current_cost)
+def plot_cost_profit_curves(curves, title='Kosten- und Gewinnanalyse über die Laufzeit', break_even_time=None):
+    time_range = curves["time"]
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=list(time_range), y=revenue_line, name='Umsatz', mode='lines', line=dict(color='green')))
-    fig.add_trace(go.Scatter(x=list(time_range), y=material_line, name='Materialkosten', mode='lines', line=dict(color='red')))
-    fig.add_trace(go.Scatter(x=list(time_range), y=overhead_line, name='Gemeinkosten', mode='lines', line=dict(color='red', dash='dot')))
-    fig.add_trace(go.Scatter(x=list(time_range), y=fail_line, name='Fehlerkosten', mode='lines', line=dict(color='red', dash='dash')))
-    fig.add_trace(go.Scatter(x=list(time_range), y=capital_line, name='Anschaffungskosten', mode='lines', line=dict(color='red', dash='longdash')))
-    fig.add_trace(go.Scatter(x=list(time_range), y=profit_line, name='Gewinn', mode='lines', line=dict(color='gold', width=3)))
+    fig.add_trace(go.Scatter(x=time_range, y=curves["revenue"], name='Umsatz', mode='lines', line=dict(color='green')))
+    fig.add_trace(go.Scatter(x=time_range, y=curves["material"], name='Materialkosten', mode='lines', line=dict(color='red')))
+    fig.add_trace(go.Scatter(x=time_range, y=curves["overhead"], name='Gemeinkosten', mode='lines', line=dict(color='red', dash='dot')))
+    fig.add_trace(go.Scatter(x=time_range, y=curves["fail"], name='Fehlerkosten', mode='lines', line=dict(color='red', dash='dash')))
+    fig.add_trace(go.Scatter(x=time_range, y=curves["capital"], name='Anschaffungskosten', mode='lines', line=dict(color='red', dash='longdash')))
+    fig.add_trace(go.Scatter(x=time_range, y=curves["profit"], name='Gewinn', mode='lines', line=dict(color='gold', width=3)))
 
     fig.update_layout(
-        title='Kosten- und Gewinnanalyse über die Laufzeit',
+        title=title,
         xaxis_title='Zeit (Min)',
         yaxis_title='Wert (€)',
         template="plotly_white",
         legend_title="Kategorie"
     )
+    if break_even_time is not None and np.isfinite(break_even_time):
+        fig.add_vline(
+            x=break_even_time,
+            line=dict(color='gold', dash='dot'),
+            annotation_text=f"Gewinnschwelle: {break_even_time:,.1f} Min",
+            annotation_position="top left"
+        )
+    return fig
+
+
+def plot_graph_sankey(graph_results):
+    # Sankey of a solved process graph: good flows between steps, rework back upstream,
+    # scrap per step and finished goods
+    df = graph_results["df"]
+    graph = graph_results["graph"]
+    units = df['Einheiten'].to_numpy()
+    good = units - df['Fehlerhafte Einheiten'].to_numpy()
+    defects = df['Fehlerhafte Einheiten'].to_numpy()
+    fail = defects / np.where(units > 0, units, 1.0)
+
+    n = len(df)
+    labels = df['Schritt'].tolist() + [f"Fehler_{name}" for name in df['Schritt']] + ["Fertigware"]
+    colors = ["blue"] * n + ["red"] * n + ["green"]
+    source, target, value, link_colors = [], [], [], []
+    for i, j, share in graph.good_edges:
+        source.append(i)
+        target.append(j)
+        value.append(good[i] * share)
+        link_colors.append("rgba(0,0,255,0.25)")
+    for i, j, share in graph.rework_edges:
+        source.append(i)
+        target.append(j)
+        value.append(units[i] * fail[i] * share)
+        link_colors.append("rgba(255,165,0,0.5)")
+    for i in range(n):
+        source.append(i)
+        target.append(n + i)
+        value.append(df['Ausschuss'].iat[i])
+        link_colors.append("rgba(255,0,0,0.25)")
+        if df['Fertigware'].iat[i] > 0:
+            source.append(i)
+            target.append(2 * n)
+            value.append(df['Fertigware'].iat[i])
+            link_colors.append("rgba(0,128,0,0.3)")
+
+    fig = go.Figure(go.Sankey(
+        node=dict(
+            label=labels,
+            color=colors,
+            pad=20,
+            thickness=30
+        ),
+        link=dict(
+            source=source,
+            target=target,
+            value=value,
+            color=link_colors
+        )
+    ))
+    fig.update_layout(
+        title="Materialfluss im Prozessgraphen (Sankey)",
+        template='plotly_white'
+    )
     return fig